@@ -0,0 +1,118 @@
+from typing import Callable
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+class SerieIndisponivelOffline(Exception):
+    pass
+
+
+def _anexar(antigo: pd.Series | pd.DataFrame, novo: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+    """ Junta as barras novas ao histórico; onde as datas coincidem, vale o dado novo. """
+    if novo is None or not len(novo):
+        return antigo
+    juntos = pd.concat([antigo, novo])
+    return juntos[~juntos.index.duplicated(keep='last')].sort_index()
+
+
+class CacheApi:
+    """ Guarda séries de mercado em disco, uma por (fonte, símbolo, frequência), num .npz com um array por
+    coluna mais o índice de datas. Nas chamadas seguintes só as datas a partir da última barra guardada são
+    pedidas à fonte (a última barra é baixada de novo, porque pode ter sido gravada ainda incompleta).
+
+    Com `offline=True` a rede nunca é usada: devolve o que estiver em disco ou levanta
+    `SerieIndisponivelOffline`. Colunas de texto voltam como object. """
+
+    def __init__(self, diretorio: str = os.path.join(os.path.expanduser('~'), '.cache', 'api_mercado'),
+                 offline: bool = False):
+        self.diretorio = diretorio
+        self.offline = offline
+
+    def _caminho(self, fonte: str, simbolo: str, frequencia: str) -> str:
+        return os.path.join(self.diretorio, fonte, f'{simbolo}_{frequencia}.npz')
+
+    def ler(self, fonte: str, simbolo: str, frequencia: str) -> pd.Series | pd.DataFrame | None:
+        caminho = self._caminho(fonte, simbolo, frequencia)
+        if not os.path.exists(caminho):
+            return None
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            indice = pd.DatetimeIndex(arquivo['indice'], name=str(arquivo['nome_indice']) or None)
+            fuso = str(arquivo['fuso'])
+            if fuso:
+                indice = indice.tz_localize('UTC').tz_convert(fuso)
+            colunas = {str(nome): arquivo[f'coluna_{i}'] for i, nome in enumerate(arquivo['colunas'])}
+            colunas = {nome: valores.astype(object) if valores.dtype.kind == 'U' else valores
+                       for nome, valores in colunas.items()}
+            if bool(arquivo['serie']):
+                nome, valores = next(iter(colunas.items()))
+                return pd.Series(valores, index=indice, name=nome or None)
+            return pd.DataFrame(colunas, index=indice)
+
+    def gravar(self, fonte: str, simbolo: str, frequencia: str, dados: pd.Series | pd.DataFrame):
+        """ Grava num arquivo temporário e troca de uma vez, para uma falha no meio não corromper o cache. """
+        serie = isinstance(dados, pd.Series)
+        df = dados.to_frame(name='' if dados.name is None else str(dados.name)) if serie else dados
+        indice = pd.DatetimeIndex(df.index)
+        fuso = '' if indice.tz is None else str(indice.tz)
+        if fuso:
+            indice = indice.tz_convert('UTC').tz_localize(None)
+        arrays = {f'coluna_{i}': df[coluna].to_numpy() for i, coluna in enumerate(df.columns)}
+        arrays = {nome: valores.astype(str) if valores.dtype == object else valores for nome, valores in arrays.items()}
+
+        caminho = self._caminho(fonte, simbolo, frequencia)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.npz')
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                np.savez(arquivo, indice=indice.values,
+                         nome_indice=np.str_(indice.name or ''), fuso=np.str_(fuso), serie=np.bool_(serie),
+                         colunas=np.array([str(coluna) for coluna in df.columns]), **arrays)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.remove(temporario)
+            raise
+
+    def remover(self, fonte: str, simbolo: str, frequencia: str):
+        caminho = self._caminho(fonte, simbolo, frequencia)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    def obter(self, fonte: str, simbolo: str, frequencia: str,
+              baixar: Callable[[pd.Timestamp | None], pd.Series | pd.DataFrame | None]) -> pd.Series | pd.DataFrame:
+        """ `baixar(desde)` busca na fonte as barras a partir de `desde` (inclusive), ou o histórico inteiro com
+        `desde=None`. Se a atualização falhar (None), devolve o que já estava guardado. """
+        guardado = self.ler(fonte, simbolo, frequencia)
+        if self.offline:
+            if guardado is None:
+                raise SerieIndisponivelOffline(f'{fonte}/{simbolo}/{frequencia} não está no cache.')
+            return guardado
+        if guardado is None or not len(guardado):
+            dados = baixar(None)
+        else:
+            dados = _anexar(guardado, baixar(guardado.index[-1]))
+        if dados is None:
+            return guardado
+        if dados is not guardado:
+            self.gravar(fonte, simbolo, frequencia, dados)
+        return dados
+
+
+# Cache global; desligado até `ativar_cache` ser chamado, e então usado por todas as fontes do pacote api.
+_cache: CacheApi | None = None
+
+
+def ativar_cache(diretorio: str | None = None, offline: bool = False) -> CacheApi:
+    global _cache
+    _cache = CacheApi(offline=offline) if diretorio is None else CacheApi(diretorio, offline)
+    return _cache
+
+
+def desativar_cache():
+    global _cache
+    _cache = None
+
+
+def obter_cache() -> CacheApi | None:
+    return _cache
@@ -3,6 +3,7 @@ import pandas as pd
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from api.cache import obter_cache
 
 
 class Moeda(Enum):
@@ -25,8 +26,28 @@ class Api:
     def __post_init__(self):
         self._scraper = CmcScraper(self.moeda.value, self.inicio, self.fim, fiat='BRL')
 
-    def obter(self) -> pd.DataFrame:
-        df = self._scraper.get_dataframe()
+    @staticmethod
+    def _formatar(df: pd.DataFrame) -> pd.DataFrame:
         df.columns = ['Data', 'Abertura', 'Maxima', 'Minima', 'Fechamento', 'Volume', 'MarketCap']
         df.set_index('Data', inplace=True)
         return df
+
+    def _baixar(self, desde: pd.Timestamp | None) -> pd.DataFrame:
+        """ Histórico inteiro (sem `desde`) ou só as barras a partir de `desde`, para o cache. """
+        if desde is None:
+            scraper = CmcScraper(self.moeda.value, fiat='BRL')
+        else:
+            scraper = CmcScraper(self.moeda.value, desde.strftime('%d-%m-%Y'), datetime.today().strftime('%d-%m-%Y'),
+                                 fiat='BRL')
+        return self._formatar(scraper.get_dataframe()).sort_index()
+
+    def obter(self) -> pd.DataFrame:
+        """ Com o cache da api ativo, guarda o histórico inteiro da moeda e devolve o trecho entre `inicio` e
+        `fim`. """
+        cache = obter_cache()
+        if cache is None:
+            return self._formatar(self._scraper.get_dataframe())
+        df = cache.obter('coinmarketcap', self.moeda.name, 'diario', self._baixar)
+        inicio = None if self.inicio is None else pd.to_datetime(self.inicio, dayfirst=True)
+        fim = None if self.fim is None else pd.to_datetime(self.fim, dayfirst=True)
+        return df.loc[inicio:fim]
@@ -4,6 +4,7 @@ import json
 from enum import Enum
 from dataclasses import dataclass
 from typing import Any
+from api.cache import obter_cache
 
 
 class Codes(Enum):
@@ -27,7 +28,15 @@ class Api:
         return None
 
     def obter_serie(self, codigo: Codes):
+        cache = obter_cache()
+        if cache is None:
+            return self._baixar_serie(codigo)
+        return cache.obter('fred', codigo.name, 'original', lambda desde: self._baixar_serie(codigo, desde))
+
+    def _baixar_serie(self, codigo: Codes, desde: pd.Timestamp | None = None):
         url = f'{self._END_POINT}/series/observations?api_key={self.api_key}&series_id={codigo.value}&file_type=json'
+        if desde is not None:
+            url += f'&observation_start={desde:%Y-%m-%d}'
         r = self._requisitar(url)
         if r is not None:
             dict_ = r['observations']
@@ -1,6 +1,7 @@
 from enum import Enum
 import ipeadatapy
 import pandas as pd
+from api.cache import obter_cache
 
 
 class Codigos(Enum):
@@ -20,7 +21,19 @@ class Inflacao:
 class Api:
 
     @staticmethod
-    def obter_serie(codigo: Codigos) -> pd.DataFrame:
-        serie = ipeadatapy.timeseries(str(codigo.value))
+    def _baixar_serie(codigo: Codigos, desde: pd.Timestamp | None = None) -> pd.DataFrame:
+        if desde is None:
+            serie = ipeadatapy.timeseries(str(codigo.value))
+        else:
+            # O filtro do ipeadata é por ano; o que vier antes de `desde` é descartado.
+            serie = ipeadatapy.timeseries(str(codigo.value), yearGreaterThan=desde.year - 1)
+            serie = serie[serie.index >= desde]
         serie.dropna(inplace=True)
         return serie
+
+    @staticmethod
+    def obter_serie(codigo: Codigos) -> pd.DataFrame:
+        cache = obter_cache()
+        if cache is None:
+            return Api._baixar_serie(codigo)
+        return cache.obter('ipea', codigo.name, 'original', lambda desde: Api._baixar_serie(codigo, desde))
@@ -6,6 +6,7 @@ import hmac
 import json
 from http import client
 from urllib.parse import urlencode
+from typing import Iterator
 
 
 class Moedas(Enum):
@@ -38,6 +39,30 @@ class ApiDados:
                 url = f'{url}/{ate.timestamp():.0f}'
         return self.obter(url)
 
+    def iterar_historico(self, moeda: Moedas,
+                         desde: datetime,
+                         ate: datetime | None = None) -> Iterator[tuple[datetime, float]]:
+        """ Gera (horario, preco) de cada negociação, buscando o histórico página a página.
+
+        A primeira página começa em `desde`; as seguintes são pedidas pelo identificador (tid) da última
+        negociação recebida, então negociações no mesmo segundo nunca são puladas, mesmo que ocupem uma página
+        inteira. Serve de entrada para o WalkForwardEmFluxo. """
+        url = f'{self.url_base}/{moeda.value}/trades/{desde.timestamp():.0f}'
+        ultimo_tid = -1
+        while True:
+            resposta = self.obter(url)
+            if resposta is None:
+                return
+            negociacoes = [negociacao for negociacao in json.loads(resposta) if negociacao['tid'] > ultimo_tid]
+            if not negociacoes:
+                return
+            for negociacao in negociacoes:
+                if ate is not None and negociacao['date'] > ate.timestamp():
+                    return
+                yield datetime.fromtimestamp(negociacao['date']), negociacao['price']
+            ultimo_tid = negociacoes[-1]['tid']
+            url = f'{self.url_base}/{moeda.value}/trades/?since={ultimo_tid}'
+
     def obter_resumo_dia_especifico(self, moeda: Moedas, data: date | datetime):
         url = f'{self.url_base}/{moeda.value}/day-summary/{data.year}/{data.month}/{data.day}'
         return self.obter(url)
@@ -49,61 +74,36 @@ MB_TAPI_SECRET = '15b79f9520dfb321492fd34b1005947c0fa74a3982b25c97ad5e310a8208c0
 REQUEST_HOST = 'www.mercadobitcoin.net'
 REQUEST_PATH = '/tapi/v3/'
 
-# Nonce
-# Para obter variação de forma simples
-# timestamp pode ser utilizado:
-#     import time
-#     tapi_nonce = str(int(time.time()))
-tapi_nonce = 1
-
-# Parâmetros
-params = {
-    'tapi_method': 'list_orders',
-    'tapi_nonce': tapi_nonce,
-    'coin_pair': 'BRLBTC'
-}
-params = urlencode(params)
-
-# Gerar MAC
-params_string = REQUEST_PATH + '?' + params
-H = hmac.new(bytes(MB_TAPI_SECRET, encoding='utf8'), digestmod=hashlib.sha512)
-H.update(params_string.encode('utf-8'))
-tapi_mac = H.hexdigest()
-
-# Gerar cabeçalho da requisição
-headers = {
-    'Content-Type': 'application/x-www-form-urlencoded',
-    'TAPI-ID': MB_TAPI_ID,
-    'TAPI-MAC': tapi_mac
-}
-
-# Realizar requisição POST
-try:
-    conn = client.HTTPSConnection(REQUEST_HOST)
-    conn.request("POST", REQUEST_PATH, params, headers)
-
-    # Print response data to console
-    response = conn.getresponse()
-    response = response.read()
-
-    response_json = json.loads(response)
-    print('status: {}'.format(response_json['status_code']))
-    print(json.dumps(response_json, indent=4))
-finally:
-    if conn:
-        conn.close()
+
 class ApiNegociacao:
 
-    url_base = 'https://www.mercadobitcoin.net/tapi/v3/'
-    chave =
+    def __init__(self, tapi_id: str, tapi_secret: str):
+        self.tapi_id = tapi_id
+        self.tapi_secret = tapi_secret
 
-    @staticmethod
-    def enviar(url: str):
-        response = requests.request("POST", url, verify=False)
-        if response.status_code == 200:
-            return response.text
+    def _gerar_mac(self, params: str) -> str:
+        params_string = REQUEST_PATH + '?' + params
+        h = hmac.new(bytes(self.tapi_secret, encoding='utf8'), digestmod=hashlib.sha512)
+        h.update(params_string.encode('utf-8'))
+        return h.hexdigest()
 
-    def _gerar_header(self):
+    def _gerar_header(self, params: str) -> dict:
         return {'Content-Type': 'application/x-www-form-urlencoded',
-                'TAPI-ID': MB_TAPI_ID,
-                'TAPI-MAC': tapi_mac}
+                'TAPI-ID': self.tapi_id,
+                'TAPI-MAC': self._gerar_mac(params)}
+
+    def enviar(self, tapi_method: str, tapi_nonce: int, **parametros) -> dict:
+        """ O nonce precisa crescer a cada chamada; int(time.time()) serve para chamadas espaçadas. """
+        params = urlencode({'tapi_method': tapi_method, 'tapi_nonce': tapi_nonce, **parametros})
+        conn = client.HTTPSConnection(REQUEST_HOST)
+        try:
+            conn.request("POST", REQUEST_PATH, params, self._gerar_header(params))
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    response_json = ApiNegociacao(MB_TAPI_ID, MB_TAPI_SECRET).enviar('list_orders', tapi_nonce=1, coin_pair='BRLBTC')
+    print('status: {}'.format(response_json['status_code']))
+    print(json.dumps(response_json, indent=4))
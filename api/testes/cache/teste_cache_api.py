@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from api.cache import CacheApi, SerieIndisponivelOffline
+
+dias = pd.date_range('2022-01-03', periods=40, freq='B', name='Data')
+historico = pd.DataFrame({'Fechamento': np.linspace(10, 20, len(dias)), 'Volume': np.arange(len(dias)),
+                          'Codigo': ['X'] * len(dias)}, index=dias)
+primeiros = historico.iloc[:20]
+
+
+class FonteFalsa:
+    """ Fonte que conhece o histórico até `fim` e registra de onde cada download começou. """
+
+    def __init__(self, dados: pd.Series | pd.DataFrame):
+        self.dados = dados
+        self.fim = 20
+        self.pedidos = []
+
+    def baixar(self, desde: pd.Timestamp | None):
+        self.pedidos.append(desde)
+        dados = self.dados.iloc[:self.fim]
+        return dados if desde is None else dados[dados.index >= desde]
+
+
+def teste_atualizacao_incremental(tmp_path):
+    cache, fonte = CacheApi(str(tmp_path)), FonteFalsa(historico)
+    pd.testing.assert_frame_equal(cache.obter('teste', 'X', '1d', fonte.baixar), primeiros, check_freq=False)
+
+    fonte.fim = 40
+    fonte.dados = historico.copy()
+    fonte.dados.iloc[19, 0] = 99.
+    resultado = cache.obter('teste', 'X', '1d', fonte.baixar)
+    # Só pede a partir da última barra guardada, e a última barra é substituída pela versão nova.
+    assert fonte.pedidos == [None, dias[19]]
+    pd.testing.assert_frame_equal(resultado, fonte.dados, check_freq=False)
+    pd.testing.assert_frame_equal(CacheApi(str(tmp_path)).ler('teste', 'X', '1d'), fonte.dados, check_freq=False)
+
+
+def teste_serie_com_fuso(tmp_path):
+    serie = pd.Series(np.arange(5.), index=pd.date_range('2022-01-03', periods=5, freq='h', tz='America/Sao_Paulo'),
+                      name='SP500')
+    cache = CacheApi(str(tmp_path))
+    cache.gravar('teste', 'SP500', 'original', serie)
+    pd.testing.assert_series_equal(cache.ler('teste', 'SP500', 'original'), serie, check_freq=False)
+
+
+def teste_modo_offline(tmp_path):
+    fonte = FonteFalsa(historico)
+    CacheApi(str(tmp_path)).obter('teste', 'X', '1d', fonte.baixar)
+    offline = CacheApi(str(tmp_path), offline=True)
+    pd.testing.assert_frame_equal(offline.obter('teste', 'X', '1d', fonte.baixar), primeiros, check_freq=False)
+    assert len(fonte.pedidos) == 1
+    with pytest.raises(SerieIndisponivelOffline):
+        offline.obter('teste', 'Y', '1d', fonte.baixar)
+
+
+def teste_falha_na_atualizacao_mantem_o_cache(tmp_path):
+    cache = CacheApi(str(tmp_path))
+    cache.obter('teste', 'X', '1d', FonteFalsa(historico).baixar)
+    resultado = cache.obter('teste', 'X', '1d', lambda desde: None)
+    pd.testing.assert_frame_equal(resultado, primeiros, check_freq=False)
@@ -0,0 +1,36 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime
+import pytest
+
+pytest.importorskip('requests')
+from api.mercado_bitcoin import REQUEST_PATH, ApiDados, ApiNegociacao, Moedas  # noqa: E402
+
+# Três páginas: a segunda inteira no mesmo segundo, e cada página repete a última negociação da anterior.
+negociacoes = [{'tid': tid, 'date': 1_600_000_000 + (tid if tid < 3 else 3 if tid < 7 else tid), 'price': 100. + tid}
+               for tid in range(10)]
+paginas = {
+    'https://www.mercadobitcoin.net/api/BTC/trades/1600000000': negociacoes[:4],
+    'https://www.mercadobitcoin.net/api/BTC/trades/?since=3': negociacoes[3:7],
+    'https://www.mercadobitcoin.net/api/BTC/trades/?since=6': negociacoes[6:10],
+    'https://www.mercadobitcoin.net/api/BTC/trades/?since=9': negociacoes[9:],
+}
+
+
+def teste_iterar_historico_pagina_pelo_tid(monkeypatch):
+    monkeypatch.setattr(ApiDados, 'obter', staticmethod(lambda url: json.dumps(paginas[url])))
+    historico = list(ApiDados().iterar_historico(Moedas.BITCOIN, datetime.fromtimestamp(1_600_000_000)))
+    assert [preco for _, preco in historico] == [100. + tid for tid in range(10)]
+
+    ate = datetime.fromtimestamp(1_600_000_003)
+    historico = list(ApiDados().iterar_historico(Moedas.BITCOIN, datetime.fromtimestamp(1_600_000_000), ate))
+    assert [preco for _, preco in historico] == [100. + tid for tid in range(7)]
+
+
+def teste_mac_da_negociacao():
+    api = ApiNegociacao('id', 'segredo')
+    params = 'tapi_method=list_orders&tapi_nonce=1'
+    esperado = hmac.new(b'segredo', f'{REQUEST_PATH}?{params}'.encode(), digestmod=hashlib.sha512).hexdigest()
+    assert api._gerar_header(params) == {'Content-Type': 'application/x-www-form-urlencoded',
+                                         'TAPI-ID': 'id', 'TAPI-MAC': esperado}
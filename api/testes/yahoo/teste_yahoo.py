@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('yfinance')
+import api.yahoo as yahoo  # noqa: E402
+from api.cache import ativar_cache, desativar_cache  # noqa: E402
+
+dias = pd.date_range('2022-01-03', periods=40, freq='B')
+
+
+def _download_falso(ticker, period=None, start=None, interval=None):
+    """ Histórico de 40 barras; `period` é o número de barras mais recentes e `start` a primeira data. """
+    colunas = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+    df = pd.DataFrame(np.column_stack([np.linspace(10, 20, len(dias))] * len(colunas)), index=dias, columns=colunas)
+    return df.iloc[-int(period):] if start is None else df[df.index >= start]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(yahoo, 'download', _download_falso)
+    yield ativar_cache(str(tmp_path))
+    desativar_cache()
+
+
+def teste_periodo_maior_nao_usa_historico_curto(cache):
+    curto = yahoo.HistoricoApi(yahoo.Tickers.PETR3).obter(frequencia='1d', quanto_tempo='10')
+    longo = yahoo.HistoricoApi(yahoo.Tickers.PETR3).obter(frequencia='1d', quanto_tempo='30')
+    assert (len(curto), len(longo)) == (10, 30)
+
+
+def teste_fechamentos_pelo_cache(cache):
+    fechamentos = yahoo.obter_fechamentos([yahoo.Tickers.PETR3, yahoo.Tickers.VALE3], '1d', '10')
+    assert list(fechamentos.columns) == ['PETR3', 'VALE3'] and len(fechamentos) == 10
+    assert cache.ler('yahoo', 'VALE3', '1d_10') is not None
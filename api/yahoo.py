@@ -2,6 +2,7 @@ import pandas as pd
 from yfinance import download
 from enum import Enum
 from dataclasses import dataclass
+from api.cache import obter_cache
 
 
 class Tickers(Enum):
@@ -90,12 +91,38 @@ class HistoricoApi:
     def __post_init__(self):
         self.ticker = self.ticker
 
-    def obter(self, frequencia, quanto_tempo) -> pd.DataFrame:
-        df = download(self.ticker.value, period=quanto_tempo, interval=frequencia)
+    def _baixar(self, frequencia, quanto_tempo, desde: pd.Timestamp | None = None) -> pd.DataFrame:
+        if desde is None:
+            df = download(self.ticker.value, period=quanto_tempo, interval=frequencia)
+        else:
+            df = download(self.ticker.value, start=desde, interval=frequencia)
         df.columns = ['Abertura', 'Maxima', 'Minima', 'Fechamento', 'Fechamento Ajustado', 'Volume']
         df.index.name = 'Data'
         return df
 
+    def obter(self, frequencia, quanto_tempo) -> pd.DataFrame:
+        """ Com o cache da api ativo, cada `quanto_tempo` tem o seu histórico guardado: o primeiro download usa o
+        período pedido e os seguintes só trazem as barras novas, sem apagar as antigas. """
+        cache = obter_cache()
+        if cache is None:
+            return self._baixar(frequencia, quanto_tempo)
+        return cache.obter('yahoo', self.ticker.name, f'{frequencia}_{quanto_tempo}',
+                           lambda desde: self._baixar(frequencia, quanto_tempo, desde))
+
+
+def obter_fechamentos(tickers: list[Tickers], frequencia, quanto_tempo) -> pd.DataFrame:
+    """ Fechamentos de vários tickers em formato tempo x ativos. Sem o cache da api, numa única requisição; com
+    ele, pelo histórico guardado de cada ticker. """
+    if obter_cache() is not None:
+        fechamentos = pd.concat([HistoricoApi(ticker).obter(frequencia, quanto_tempo)['Fechamento']
+                                 for ticker in tickers], axis=1)
+    else:
+        df = download([ticker.value for ticker in tickers], period=quanto_tempo, interval=frequencia)
+        fechamentos = df['Close'][[ticker.value for ticker in tickers]]
+    fechamentos.columns = [ticker.name for ticker in tickers]
+    fechamentos.index.name = 'Data'
+    return fechamentos
+
 
 if __name__ == "__main__":
     x = HistoricoApi(Tickers.PETR3).obter(frequencia='1d', quanto_tempo='1m')
@@ -0,0 +1,10 @@
+import numpy as np
+
+
+def resolver_lote(matrizes: np.ndarray, vetores: np.ndarray) -> np.ndarray:
+    """ Resolve a pilha de sistemas `matrizes[n] @ x[n] = vetores[n]` de uma vez, recorrendo à pseudo-inversa se
+    algum for singular. """
+    try:
+        return np.linalg.solve(matrizes, vetores[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum('nij,nj->ni', np.linalg.pinv(matrizes), vetores)
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable
+import hashlib
+import inspect
+import weakref
+import numpy as np
+import pandas as pd
+
+
+@dataclass()
+class EstatisticasCache:
+    acertos: int = 0
+    falhas: int = 0
+    remocoes: int = 0
+    bytes_ocupados: int = 0
+    itens: int = 0
+
+
+@dataclass()
+class _Entrada:
+    valor: Any
+    tamanho: int
+    # Referências fracas aos arrays donos dos dados de entrada: a entrada só vale enquanto eles existirem.
+    referencias: tuple[weakref.ref, ...]
+    finalizadores: tuple[weakref.finalize, ...] = ()
+
+
+def _tamanho_bytes(valor: Any) -> int:
+    if isinstance(valor, (pd.Series, pd.DataFrame)):
+        return int(np.sum(valor.memory_usage(index=True)))
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, tuple):
+        return sum(_tamanho_bytes(item) for item in valor)
+    return 64
+
+
+def _copiar(valor: Any) -> Any:
+    if isinstance(valor, (pd.Series, pd.DataFrame, np.ndarray)):
+        return valor.copy()
+    if isinstance(valor, tuple):
+        return tuple(_copiar(item) for item in valor)
+    return valor
+
+
+class CacheIndicadores:
+    """ Guarda resultados de indicadores até `tamanho_maximo_bytes`, removendo os usados há mais tempo (LRU).
+
+    A chave usa o endereço dos dados de entrada (mais formato, tipo, índice e um hash de até 1024 valores
+    igualmente espaçados), não o seu conteúdo inteiro: `df['Fechamento']` selecionado duas vezes cai na mesma
+    entrada, porque as duas séries apontam para o mesmo array. A entrada é descartada assim que esse array deixa
+    de existir. Séries de até 1024 valores são comparadas inteiras; nas maiores, uma alteração no lugar fora da
+    amostra não é percebida: chame `limpar` depois de modificar séries no lugar. """
+
+    def __init__(self, tamanho_maximo_bytes: int = 256 * 2 ** 20):
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self._entradas: OrderedDict[tuple, _Entrada] = OrderedDict()
+        self._acertos = 0
+        self._falhas = 0
+        self._remocoes = 0
+        self._bytes_ocupados = 0
+
+    def obter(self, chave: tuple, referencias: tuple = ()) -> tuple[bool, Any]:
+        """ Retorna (encontrado, valor). O valor é uma cópia, para o cache não ser alterado por quem o usa. """
+        entrada = self._entradas.get(chave)
+        if entrada is None or any(ref() is not objeto for ref, objeto in zip(entrada.referencias, referencias)):
+            if entrada is not None:
+                self._remover(chave)
+            self._falhas += 1
+            return False, None
+        self._entradas.move_to_end(chave)
+        self._acertos += 1
+        return True, _copiar(entrada.valor)
+
+    def guardar(self, chave: tuple, valor: Any, referencias: tuple = ()):
+        tamanho = _tamanho_bytes(valor)
+        if tamanho > self.tamanho_maximo_bytes:
+            return
+        if chave in self._entradas:
+            self._remover(chave)
+        # Um finalizador por array de entrada, com referência fraca ao cache para não mantê-lo vivo.
+        cache = weakref.ref(self)
+        finalizadores = tuple(weakref.finalize(obj, _descartar, cache, chave) for obj in referencias)
+        self._entradas[chave] = _Entrada(_copiar(valor), tamanho, tuple(weakref.ref(obj) for obj in referencias),
+                                         finalizadores)
+        self._bytes_ocupados += tamanho
+        while self._bytes_ocupados > self.tamanho_maximo_bytes:
+            self._remover(next(iter(self._entradas)))
+            self._remocoes += 1
+
+    def _remover(self, chave: tuple):
+        entrada = self._entradas.pop(chave)
+        for finalizador in entrada.finalizadores:
+            finalizador.detach()
+        self._bytes_ocupados -= entrada.tamanho
+
+    def limpar(self):
+        for chave in list(self._entradas):
+            self._remover(chave)
+
+    @property
+    def estatisticas(self) -> EstatisticasCache:
+        return EstatisticasCache(acertos=self._acertos, falhas=self._falhas, remocoes=self._remocoes,
+                                 bytes_ocupados=self._bytes_ocupados, itens=len(self._entradas))
+
+
+def _descartar(cache: weakref.ref, chave: tuple):
+    """ Chamado quando um array de entrada é coletado: a entrada não pode mais ser acertada. """
+    cache = cache()
+    if cache is not None and chave in cache._entradas:
+        cache._remover(chave)
+
+
+# Cache global; desligado até `ativar_cache` ser chamado.
+_cache: CacheIndicadores | None = None
+
+
+def ativar_cache(tamanho_maximo_bytes: int = 256 * 2 ** 20) -> CacheIndicadores:
+    global _cache
+    _cache = CacheIndicadores(tamanho_maximo_bytes)
+    return _cache
+
+
+def desativar_cache():
+    global _cache
+    _cache = None
+
+
+def obter_cache() -> CacheIndicadores | None:
+    return _cache
+
+
+def _dono(valores: np.ndarray) -> np.ndarray:
+    """ Array que é dono da memória de `valores` (o fim da cadeia de `base`). """
+    while isinstance(valores.base, np.ndarray):
+        valores = valores.base
+    return valores
+
+
+# Valores de cada array (igualmente espaçados, incluindo as pontas) que entram na chave.
+_TAMANHO_AMOSTRA = 1024
+
+
+def _impressao_indice(indice: pd.Index, referencias: list) -> Any:
+    if isinstance(indice, pd.RangeIndex):
+        return 'RangeIndex', indice.start, indice.stop, indice.step
+    return type(indice).__name__, str(indice.dtype), _impressao(indice.values, referencias)
+
+
+def _impressao(valor: Any, referencias: list) -> Any:
+    """ Impressão barata de um argumento, sem copiar dados. Arrays entram pelo endereço e formato da memória e
+    por um hash de uma amostra dos valores, e séries e DataFrames pelos arrays de cada coluna e pelo índice, então
+    a mesma coluna selecionada de novo dá a mesma impressão. Objetos entram pelos atributos. """
+    if isinstance(valor, np.ndarray):
+        referencias.append(_dono(valor))
+        amostra = valor.flat[np.linspace(0, valor.size - 1, min(valor.size, _TAMANHO_AMOSTRA), dtype=np.int64)]
+        conteudo = (hashlib.blake2b(amostra.tobytes(), digest_size=16).digest() if valor.dtype != object
+                    else tuple(amostra))
+        return ('ndarray', valor.__array_interface__['data'][0], valor.shape, valor.strides, valor.dtype.str,
+                conteudo)
+    if isinstance(valor, pd.Series):
+        return ('Series', _impressao(valor.name, referencias), _impressao(valor.to_numpy(), referencias),
+                _impressao_indice(valor.index, referencias))
+    if isinstance(valor, pd.DataFrame):
+        return ('DataFrame', _impressao(tuple(valor.columns), referencias),
+                tuple(_impressao(valor.iloc[:, i].to_numpy(), referencias) for i in range(valor.shape[1])),
+                _impressao_indice(valor.index, referencias))
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, type):
+        return valor.__qualname__
+    if isinstance(valor, (tuple, list)):
+        return tuple(_impressao(item, referencias) for item in valor)
+    if hasattr(valor, '__dict__'):
+        return type(valor).__qualname__, tuple((nome, _impressao(atributo, referencias))
+                                               for nome, atributo in sorted(vars(valor).items()))
+    raise TypeError(f'Argumento do tipo {type(valor)} não pode ser usado como chave do cache.')
+
+
+def memorizar(funcao: Callable) -> Callable:
+    """ Usa o cache global, se ativo, para `funcao`. Sem cache ativo a chamada segue direto. """
+    assinatura = inspect.signature(funcao)
+
+    @wraps(funcao)
+    def funcao_memorizada(*args, **kwargs):
+        if _cache is None:
+            return funcao(*args, **kwargs)
+        argumentos = assinatura.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        referencias = []
+        try:
+            chave = (funcao.__qualname__, _impressao(tuple(argumentos.arguments.items()), referencias))
+        except TypeError:
+            return funcao(*args, **kwargs)
+        # Arrays repetidos (o mesmo índice em várias séries) entram uma vez só.
+        referencias = tuple({id(obj): obj for obj in referencias}.values())
+        encontrado, valor = _cache.obter(chave, referencias)
+        if encontrado:
+            return valor
+        valor = funcao(*args, **kwargs)
+        _cache.guardar(chave, valor, referencias)
+        return valor
+
+    return funcao_memorizada
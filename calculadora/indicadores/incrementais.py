@@ -0,0 +1,208 @@
+from collections import deque
+import math
+import numpy as np
+
+
+def _validar_janela(janela: int):
+    if janela <= 0:
+        raise ValueError('Janela não pode ser menor ou igual a zero.')
+
+
+def _dividir(numerador: float, denominador: float) -> float:
+    """ Divisão com a semântica do pandas: x/0 dá ±inf e 0/0 dá nan, sem exceção. """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(numerador) / np.float64(denominador))
+
+
+class _EstatisticasMoveis:
+    """ Média e variância das últimas `janela` observações, atualizadas com uma entrada e uma saída (Welford),
+    como o `rolling` do pandas. Valores nulos ocupam a janela mas não entram nas contas. """
+
+    def __init__(self, janela: int):
+        _validar_janela(janela)
+        self.janela = janela
+        self._valores = deque()
+        self._n = 0
+        self._media = 0.
+        self._m2 = 0.
+
+    def adicionar(self, valor: float):
+        self._valores.append(valor)
+        if valor == valor:
+            self._n += 1
+            delta = valor - self._media
+            self._media += delta / self._n
+            self._m2 += delta * (valor - self._media)
+        if len(self._valores) > self.janela:
+            self._remover(self._valores.popleft())
+
+    def _remover(self, valor: float):
+        if valor != valor:
+            return
+        self._n -= 1
+        if self._n == 0:
+            self._media = self._m2 = 0.
+            return
+        delta = valor - self._media
+        self._media -= delta / self._n
+        self._m2 -= delta * (valor - self._media)
+
+    @property
+    def completa(self) -> bool:
+        return self._n == self.janela
+
+    def media(self) -> float:
+        return self._media if self.completa else np.nan
+
+    def soma(self) -> float:
+        return self._media * self._n if self.completa else np.nan
+
+    def desvio_padrao(self) -> float:
+        if not self.completa or self._n < 2:
+            return np.nan
+        return math.sqrt(max(self._m2, 0.) / (self._n - 1))
+
+
+class _MediaExponencialPandas:
+    """ Recorrência do `ewm(alpha).mean()` do pandas (com ignore_na=False), inclusive o decaimento dos pesos
+    durante valores nulos. """
+
+    def __init__(self, alpha: float, adjust: bool):
+        # O pandas converte alpha em centro de massa e de volta; repetir a conversão deixa o resultado idêntico.
+        centro_de_massa = (1 - alpha) / alpha
+        alpha = 1 / (1 + centro_de_massa)
+        self._fator = 1 - alpha
+        self._peso_novo = 1. if adjust else alpha
+        self._adjust = adjust
+        # Com centro de massa 1 e sem ajuste, o pandas usa 1 - peso antigo como peso do valor novo.
+        self._centro_unitario = not adjust and centro_de_massa == 1
+        self._peso_antigo = 1.
+        self.valor = np.nan
+
+    def atualizar(self, valor: float) -> float:
+        if self.valor != self.valor:
+            self.valor = valor
+            return self.valor
+        self._peso_antigo *= self._fator
+        if self._centro_unitario:
+            self._peso_novo = 1 - self._peso_antigo
+        if valor == valor:
+            if self.valor != valor:
+                self.valor = (self._peso_antigo * self.valor + self._peso_novo * valor) / \
+                             (self._peso_antigo + self._peso_novo)
+            self._peso_antigo = self._peso_antigo + self._peso_novo if self._adjust else 1.
+        return self.valor
+
+
+class MediaSimplesIncremental:
+    """ Equivale a `MediaMovel.simples` atualizada a cada valor. """
+
+    def __init__(self, janela: int):
+        self._estatisticas = _EstatisticasMoveis(janela)
+        self.valor = np.nan
+
+    def atualizar(self, valor: float) -> float:
+        self._estatisticas.adicionar(valor)
+        self.valor = self._estatisticas.media()
+        return self.valor
+
+
+class MediaExponencialIncremental:
+    """ Equivale a `MediaMovel.exponencial` atualizada a cada valor. """
+
+    def __init__(self, janela: int):
+        _validar_janela(janela)
+        self._media = _MediaExponencialPandas(alpha=2 / (janela + 1), adjust=False)
+        self.valor = np.nan
+
+    def atualizar(self, valor: float) -> float:
+        self.valor = self._media.atualizar(valor)
+        return self.valor
+
+
+class IndiceForcaRelativaIncremental:
+    """ Equivale a `IndiceForcaRelativa.simples` (ou `.exp`, com `exponencial=True`) atualizado a cada retorno,
+    inclusive na forma como subidas e quedas são separadas. Precisa receber os valores em porcentagem. """
+
+    def __init__(self, janela: int, exponencial: bool = False):
+        _validar_janela(janela)
+        if exponencial:
+            self._subidas = _MediaExponencialPandas(alpha=2 / (1 + janela), adjust=True)
+            self._quedas = _MediaExponencialPandas(alpha=2 / (1 + janela), adjust=True)
+        else:
+            self._subidas = MediaSimplesIncremental(janela)
+            self._quedas = MediaSimplesIncremental(janela)
+        self.valor = np.nan
+
+    def atualizar(self, valor: float) -> float:
+        media_subidas = self._subidas.atualizar(0. if valor > 0 else valor)
+        media_quedas = self._quedas.atualizar(0. if valor < 0 else valor)
+        forca_relativa = _dividir(media_subidas, -media_quedas)
+        self.valor = 100 - _dividir(100, 1 + forca_relativa)
+        return self.valor
+
+
+class ATRIncremental:
+    """ Equivale a `atr` atualizado a cada barra. """
+
+    def __init__(self, janela: int):
+        self._estatisticas = _EstatisticasMoveis(janela)
+        self._fechamento_anterior = np.nan
+        self.valor = np.nan
+
+    def atualizar(self, maxima: float, minima: float, fechamento: float) -> float:
+        amplitudes = [maxima - minima, abs(maxima - self._fechamento_anterior),
+                      abs(minima - self._fechamento_anterior)]
+        amplitudes = [amplitude for amplitude in amplitudes if amplitude == amplitude]
+        self._fechamento_anterior = fechamento
+        self._estatisticas.adicionar(max(amplitudes) if amplitudes else np.nan)
+        self.valor = self._estatisticas.soma() / self._estatisticas.janela
+        return self.valor
+
+
+class SharpeMovelIncremental:
+    """ Equivale a `indice_de_sharpe_movel` atualizado a cada par de retornos. """
+
+    def __init__(self, janela: int):
+        self._estatisticas = _EstatisticasMoveis(janela)
+        self.valor = np.nan
+
+    def atualizar(self, r_ativo: float, r_livre_risco: float = 0.) -> float:
+        self._estatisticas.adicionar(r_ativo - r_livre_risco)
+        self.valor = math.sqrt(self._estatisticas.janela) * _dividir(self._estatisticas.media(),
+                                                                    self._estatisticas.desvio_padrao())
+        return self.valor
+
+
+class DrawdownIncremental:
+    """ Equivale a `drawdown` atualizado a cada valor. O máximo móvel vem de uma fila monotônica: cada valor entra
+    e sai dela uma única vez, O(1) amortizado. """
+
+    def __init__(self, janela: int):
+        _validar_janela(janela)
+        self.janela = janela
+        # Posições e valores em ordem decrescente de valor; o máximo da janela está na frente.
+        self._maximos = deque()
+        self._nulos = deque()
+        self._posicao = -1
+        self.valor = np.nan
+
+    def atualizar(self, valor: float) -> float:
+        self._posicao += 1
+        inicio = self._posicao - self.janela + 1
+        if valor != valor:
+            self._nulos.append(self._posicao)
+        else:
+            while self._maximos and self._maximos[-1][1] <= valor:
+                self._maximos.pop()
+            self._maximos.append((self._posicao, valor))
+        while self._maximos and self._maximos[0][0] < inicio:
+            self._maximos.popleft()
+        while self._nulos and self._nulos[0] < inicio:
+            self._nulos.popleft()
+
+        if inicio < 0 or self._nulos:
+            self.valor = np.nan
+        else:
+            self.valor = _dividir(valor, self._maximos[0][1]) - 1
+        return self.valor
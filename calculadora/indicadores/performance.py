@@ -1,15 +1,90 @@
 import pandas as pd
 import numpy as np
+from dados.preprocessamento import para_pandas
 
 
-def drawdown(janela: int, serie: pd.Series):
+def drawdown(janela: int, serie: pd.Series | pd.DataFrame):
+    """ Aceita uma série ou um painel tempo x ativos. """
+    serie = para_pandas(serie)
     maximo_movel = serie.rolling(janela).max()
     return serie / maximo_movel - 1
 
 
-def indice_de_sharpe_movel(r_livre_risco: pd.Series,
-                           r_ativo: pd.Series,
+def indice_de_sharpe_movel(r_livre_risco: pd.Series | float,
+                           r_ativo: pd.Series | pd.DataFrame,
                            janela: int):
-    excesso_retorno = r_ativo - r_livre_risco
+    """ `r_ativo` pode ser um painel tempo x ativos; a mesma taxa livre de risco é descontada de todas as
+    colunas. Entre um array e um objeto do pandas o desconto é por posição, com o índice do que tiver índice. """
+    if isinstance(r_livre_risco, pd.Series) and not isinstance(r_ativo, (pd.Series, pd.DataFrame)):
+        r_ativo = para_pandas(r_ativo, modelo=r_livre_risco)
+    r_ativo = para_pandas(r_ativo)
+    if isinstance(r_ativo, pd.DataFrame) and not np.isscalar(r_livre_risco):
+        if not isinstance(r_livre_risco, pd.Series):
+            r_livre_risco = pd.Series(np.asarray(r_livre_risco, dtype=float), index=r_ativo.index)
+        excesso_retorno = r_ativo.sub(r_livre_risco, axis=0)
+    else:
+        excesso_retorno = r_ativo - r_livre_risco
     rolling = excesso_retorno.rolling(window=janela)
     return np.sqrt(janela) * rolling.mean() / rolling.std()
+
+
+def _duracao_maxima(em_queda: np.ndarray) -> np.ndarray:
+    """ Maior sequência de períodos seguidos com `em_queda` verdadeiro, por coluna. """
+    posicoes = np.arange(len(em_queda))[:, None]
+    ultimo_topo = np.maximum.accumulate(np.where(em_queda, -1, posicoes), axis=0)
+    return (posicoes - ultimo_topo).max(axis=0)
+
+
+def _metricas_lote(curvas: np.ndarray, periodos_por_ano: int, taxa_por_periodo: float,
+                   exposicoes: np.ndarray | None) -> dict[str, np.ndarray]:
+    retornos = curvas[1:] / curvas[:-1] - 1
+    anos = len(retornos) / periodos_por_ano
+    excesso = retornos - taxa_por_periodo
+    desvio = retornos.std(axis=0, ddof=1)
+    desvio_negativo = np.sqrt(np.mean(np.minimum(excesso, 0) ** 2, axis=0))
+    picos = np.maximum.accumulate(curvas, axis=0)
+    quedas = curvas / picos - 1
+    com_variacao = (retornos != 0).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metricas = {'cagr': (curvas[-1] / curvas[0]) ** (1 / anos) - 1,
+                    'volatilidade': desvio * np.sqrt(periodos_por_ano),
+                    'sharpe': excesso.mean(axis=0) / desvio * np.sqrt(periodos_por_ano),
+                    'sortino': excesso.mean(axis=0) / desvio_negativo * np.sqrt(periodos_por_ano),
+                    'max_drawdown': quedas.min(axis=0),
+                    'duracao_max_drawdown': _duracao_maxima(quedas < 0),
+                    # Períodos parados (fora do mercado) não contam como erro nem acerto.
+                    'acerto': (retornos > 0).sum(axis=0) / com_variacao}
+    if exposicoes is not None:
+        metricas['giro'] = np.abs(np.diff(exposicoes, axis=0)).sum(axis=0) / anos
+    return metricas
+
+
+def tabela_de_desempenho(curvas: pd.DataFrame | np.ndarray,
+                         periodos_por_ano: int = 252,
+                         taxa_livre_risco: float = 0.,
+                         exposicoes: pd.DataFrame | np.ndarray | None = None,
+                         ordenar_por: str = 'sharpe',
+                         tamanho_lote: int = 512) -> pd.DataFrame:
+    """ Métricas de várias curvas de patrimônio (tempo x curvas, uma coluna por conjunto de parâmetros) de uma
+    vez: CAGR, volatilidade, Sharpe e Sortino anualizados, máximo drawdown e sua duração em períodos, taxa de
+    acerto e, com `exposicoes` (mesmo formato, fração do patrimônio exposta), o giro anual.
+
+    `taxa_livre_risco` é anual. Para os retornos acumulados do backtest, use 1 + retornos como curva. As colunas
+    são processadas em lotes de `tamanho_lote` para limitar a memória. Retorna uma linha por curva, ordenada pela
+    métrica `ordenar_por` (da melhor para a pior); sem curvas, uma tabela vazia com as mesmas colunas. """
+    rotulos = curvas.columns if isinstance(curvas, pd.DataFrame) else pd.RangeIndex(np.shape(curvas)[1])
+    curvas = np.asarray(curvas, dtype=float)
+    if exposicoes is not None:
+        exposicoes = np.asarray(exposicoes, dtype=float)
+    taxa_por_periodo = (1 + taxa_livre_risco) ** (1 / periodos_por_ano) - 1
+
+    # Sem colunas, um lote vazio ainda dá os nomes das métricas.
+    lotes = [_metricas_lote(curvas[:, inicio:inicio + tamanho_lote], periodos_por_ano, taxa_por_periodo,
+                            None if exposicoes is None else exposicoes[:, inicio:inicio + tamanho_lote])
+             for inicio in range(0, max(curvas.shape[1], 1), tamanho_lote)]
+    tabela = pd.DataFrame({metrica: np.concatenate([lote[metrica] for lote in lotes]) for metrica in lotes[0]},
+                          index=rotulos)
+    # Volatilidade, duração do drawdown e giro: o melhor é o menor. Nas demais (o drawdown é negativo), o maior.
+    crescente = ordenar_por in ('volatilidade', 'duracao_max_drawdown', 'giro')
+    return tabela.sort_values(ordenar_por, ascending=crescente, kind='stable')
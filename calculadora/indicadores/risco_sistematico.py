@@ -1,5 +1,8 @@
+from functools import cached_property, partial
 import numpy as np
 import pandas as pd
+from calculadora.algebra import resolver_lote
+from calculadora.paralelo import mapear
 
 
 class JanelaNegativa(Exception):
@@ -32,51 +35,67 @@ class Mahalanobis:
     def __init__(self, df_precos: pd.DataFrame):
         self._df = _filtrar_df(df_precos.pct_change())
 
-    @property
-    def _criar_matriz_de_cov_inv(self):
-        cov = self._df.cov()
-        cov_inversa = np.linalg.pinv(cov.values)
-        return pd.DataFrame(cov_inversa)
+    @cached_property
+    def _matriz_de_cov_inv(self) -> np.ndarray:
+        """ Inversa (pseudo) da covariância da amostra inteira, calculada uma única vez. """
+        return np.linalg.pinv(self._df.cov().values)
 
-    def _obter_distancia_de_mahalanobis(self, linha: pd.DataFrame, df: pd.DataFrame):
-
-        # Vetor de médias
-        medias = df.mean()
-
-        # Centralizando cada coluna em torno da sua média histórica.
-        linha_centralizada = (linha - medias)
-
-        # Multiplicação matricial da linha centralizada com a matriz de covariância inversa.
-        primeiro_termo = np.dot(linha_centralizada, self._criar_matriz_de_cov_inv)
-
-        # # Multiplicação matricial da matriz de covariância inversa com a linha centralizada transposta.
-        resultado = np.dot(primeiro_termo, linha_centralizada.transpose())
+    @staticmethod
+    def _distancias(centralizados: np.ndarray, cov_inv: np.ndarray) -> np.ndarray:
+        """ Distância c' S^-1 c de cada linha centralizada. """
+        return np.einsum('ij,jk,ik->i', centralizados, cov_inv, centralizados)
+
+    def _obter_serie_mahalanobis(self, janela: int) -> pd.Series:
+        # Cada linha é centralizada na média da janela que termina nela.
+        medias = self._df.rolling(janela).mean().values[janela - 1:]
+        centralizados = self._df.values[janela - 1:] - medias
+        distancias = self._distancias(centralizados, self._matriz_de_cov_inv)
+        serie = np.concatenate([self._gerar_inicio_nulo_serie(janela=janela), distancias])
+        return pd.Series(serie, index=self._df.index)
 
-        # Coletando o resultado para aquela linha.
-        return resultado.reshape(1)[0]
+    def _obter_serie_mahalanobis_cov_movel(self, janela: int, tamanho_lote: int = 256) -> pd.Series:
+        """ Usa a média e a covariância da própria janela. Somas de x e de x x' são atualizadas com uma entrada e
+        uma saída por passo (O(k²)), e os sistemas são resolvidos em lotes. """
+        valores = self._df.values
+        # Centralizar na média geral não muda a covariância e reduz o cancelamento numérico.
+        valores = valores - valores.mean(axis=0)
+        n, k = valores.shape
+        soma = valores[:janela].sum(axis=0)
+        produtos = valores[:janela].T @ valores[:janela]
+
+        distancias = np.empty(n - janela + 1)
+        covs = np.empty((min(tamanho_lote, len(distancias)), k, k))
+        centralizados = np.empty((len(covs), k))
+        inicio_lote = 0
+        for i in range(janela - 1, n):
+            if i >= janela:
+                soma += valores[i] - valores[i - janela]
+                produtos += np.outer(valores[i], valores[i]) - np.outer(valores[i - janela], valores[i - janela])
+            posicao = i - janela + 1 - inicio_lote
+            media = soma / janela
+            covs[posicao] = (produtos - janela * np.outer(media, media)) / (janela - 1)
+            centralizados[posicao] = valores[i] - media
+            if posicao == len(covs) - 1 or i == n - 1:
+                lote = centralizados[:posicao + 1]
+                distancias[inicio_lote:inicio_lote + posicao + 1] = np.einsum(
+                    'ni,ni->n', lote, resolver_lote(covs[:posicao + 1], lote))
+                inicio_lote += posicao + 1
+
+        serie = np.concatenate([self._gerar_inicio_nulo_serie(janela=janela), distancias])
+        return pd.Series(serie, index=self._df.index)
 
     @staticmethod
     def _gerar_inicio_nulo_serie(janela: int) -> list[np.nan]:
         return [np.nan] * (janela - 1)
 
-    def _obter_janela(self, linha_atual: int, janela: int):
-        return self._df.iloc[linha_atual - janela:linha_atual]
-
-    def _obter_serie_mahalanobis(self, janela: int):
-        serie = self._gerar_inicio_nulo_serie(janela=janela)
-        for linha in range(janela, len(self._df) + 1):
-            # Selecionando somente os dados correspondentes a janela.
-            df_janela = self._obter_janela(linha_atual=linha, janela=janela)
-            # Seleciona a última linha
-            linha = self._df.iloc[linha - 1]
-            serie.append(self._obter_distancia_de_mahalanobis(linha, df_janela))
-        return pd.Series(serie, index=self._df.index)
-
-    def obter_serie(self, janela: int = 252) -> pd.Series:
+    def obter_serie(self, janela: int = 252, covariancia_movel: bool = False) -> pd.Series:
         """
         Usado em contextos que queremos saber como as interelações entre séries mudam. Por exemplo, se dois mercados
         costumam subir simultameanente e, de repente, deixam de fazer isso, esse indicador vai captar essa mudança
-        de comportamento."""
+        de comportamento.
+
+        Por padrão usa a covariância da amostra inteira; com `covariancia_movel`, a covariância da própria
+        janela."""
 
         # Valida o valor da janela.
         _validar_janela(janela)
@@ -86,6 +105,8 @@ class Mahalanobis:
             serie = [np.nan] * len(self._df)
             return pd.Series(serie, index=self._df.index)
 
+        if covariancia_movel:
+            return self._obter_serie_mahalanobis_cov_movel(janela=janela)
         return self._obter_serie_mahalanobis(janela=janela)
 
     def obter_series_dif(self, janela: int = 252) -> pd.Series:
@@ -93,32 +114,38 @@ class Mahalanobis:
         return mahalanobis - mahalanobis.shift(1)
 
 
+def _n_autovalores_relevantes(n_ativos: int, pct_relevante: float) -> int:
+    """ Quantidade de maiores autovalores somados: as posições 0, 1, ..., pct_relevante * n_ativos. """
+    return min(n_ativos, int(np.floor(pct_relevante * n_ativos)) + 1)
+
+
+def _razoes_de_absorcao(retornos: np.ndarray, inicio: int, fim: int, janela: int, n_relevantes: int) -> np.ndarray:
+    """ Razão de absorção das janelas que começam em inicio, ..., fim - 1. """
+    janelas = np.lib.stride_tricks.sliding_window_view(retornos, janela, axis=0)[inicio:fim]
+    centralizadas = janelas - janelas.mean(axis=2, keepdims=True)
+    covs = centralizadas @ centralizadas.transpose(0, 2, 1) / (janela - 1)
+    autovalores = np.linalg.eigvalsh(covs)
+    return autovalores[:, -n_relevantes:].sum(axis=1) / np.trace(covs, axis1=1, axis2=2)
+
+
 class AbsortionRatio:
 
     def __init__(self, df: pd.DataFrame):
         self._df = df
 
-    @staticmethod
-    def _calcular_valor_de_eigen(df: pd.DataFrame, pct_relevante: float = 0.2):
-        """ Calcula o Eigen value para a dataframe especificada. """
-        cov_matrix = df.cov()
-        eigen_values, eigen_vector = np.linalg.eig(cov_matrix)
-        eigen_variancias = pd.Series(eigen_values).sort_values(ascending=False).reset_index(drop=True)
-        return eigen_variancias[eigen_variancias.index <= pct_relevante * len(eigen_variancias)]
-
-    def _calcular_abortion_ratio(self, df: pd.DataFrame,  pct_relevante: float = 0.2):
-        eigen_value_soma = self._calcular_valor_de_eigen(df, pct_relevante).sum()
-        variancia_total = df.var().sum()
-        return eigen_value_soma / variancia_total
-
-    def obter(self, janela: int = 252) -> pd.Series:
+    def obter(self, janela: int = 252, memoria_maxima: int = 256 * 2 ** 20, n_processos: int = 1,
+              pct_relevante: float = 0.2) -> pd.Series:
         """ Primeiramente, esse indicador identifica estatisticamente quais fatores são relevantes para explicar a
         variância de mercado e elenca os mais relevantes com base no parâmetro.
 
         A ideia, no entanto, segue em analisar o quão distribuída esta revelância está entre os fatores. Com isso,
         quanto mais concentrado a revelância em alguns fatores, maior é o risco sistemático, portanto, provalvemente
         alguma notícia (seja positiva ou negativa) será mais impactante para o mercado. Por outro lado, quanto mais
-        distribuído for a relevância dos fatores, provável que menos impactante seja cada notícia. """
+        distribuído for a relevância dos fatores, provável que menos impactante seja cada notícia.
+
+        As covariâncias de todas as janelas são empilhadas e decompostas juntas (matrizes simétricas), em lotes
+        que ocupam no máximo cerca de `memoria_maxima` bytes. Com `n_processos` diferente de 1, os lotes são
+        distribuídos entre processos. """
         # Valida o valor da janela.
         _validar_janela(janela)
         df_precos = _filtrar_df(self._df.pct_change())
@@ -126,15 +153,23 @@ class AbsortionRatio:
         if len(df_precos) < janela:
             serie = [np.nan] * len(df_precos)
             return pd.Series(serie, index=df_precos.index)
-        # 'Abs ratios' serão guardadas aqui.
-        abs_ratios = [np.nan] * (janela - 1)
-        for linha in range(janela, len(df_precos)+1):
-            # Selecionando somente os dados correspondentes a janela.
-            df_janela = df_precos.iloc[linha-janela:linha]
-            abs_ratio = self._calcular_abortion_ratio(df=df_janela, pct_relevante=0.2)
-            abs_ratios.append(abs_ratio)
+
+        retornos = np.ascontiguousarray(df_precos.values, dtype=float)
+        n_ativos = retornos.shape[1]
+        n_relevantes = _n_autovalores_relevantes(n_ativos, pct_relevante=pct_relevante)
+
+        n_janelas = len(retornos) - janela + 1
+        # Por janela: a cópia centralizada, a covariância e o espaço de trabalho da decomposição.
+        bytes_por_janela = 8 * (n_ativos * janela + 3 * n_ativos * n_ativos)
+        tamanho_lote = max(1, memoria_maxima // bytes_por_janela)
+        lotes = [(inicio, min(inicio + tamanho_lote, n_janelas)) for inicio in range(0, n_janelas, tamanho_lote)]
+
+        calcular = partial(_razoes_de_absorcao, janela=janela, n_relevantes=n_relevantes)
+        abs_ratios = np.concatenate([[np.nan] * (janela - 1)] + mapear(calcular, lotes, retornos, n_processos))
         return pd.Series(abs_ratios, index=df_precos.index)
 
-    def obter_dif(self, janela: int = 252) -> pd.Series:
-        abs_ratio = self.obter(janela)
+    def obter_dif(self, janela: int = 252, memoria_maxima: int = 256 * 2 ** 20, n_processos: int = 1,
+                  pct_relevante: float = 0.2) -> pd.Series:
+        abs_ratio = self.obter(janela, memoria_maxima=memoria_maxima, n_processos=n_processos,
+                               pct_relevante=pct_relevante)
         return abs_ratio - abs_ratio.shift(1)
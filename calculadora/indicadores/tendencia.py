@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from dados.preprocessamento import normalizar, reescalar
+from calculadora.indicadores.cache import memorizar
+from dados.preprocessamento import normalizar, normalizar_movel, para_pandas, reescalar, reescalar_movel
 
 
 class JanelaNegativa(Exception):
@@ -16,20 +18,36 @@ class JanelaNegativa(Exception):
 
 @dataclass
 class MediaMovel:
+    """ As médias aceitam uma série ou um painel tempo x ativos (DataFrame ou array 2D), calculado de uma vez. """
 
     @classmethod
-    def simples(cls, serie: pd.Series, window: int):
-        return serie.rolling(window=window).mean()
+    @memorizar
+    def simples(cls, serie: pd.Series | pd.DataFrame, window: int):
+        return para_pandas(serie).rolling(window=window).mean()
 
     @classmethod
-    def exponencial(cls, serie: pd.Series, window: int):
+    @memorizar
+    def exponencial(cls, serie: pd.Series | pd.DataFrame, window: int):
         alpha = 2/(window+1)
-        return serie.ewm(alpha=alpha, adjust=False).mean()
+        return para_pandas(serie).ewm(alpha=alpha, adjust=False).mean()
 
 
 @dataclass()
 class IndiceForcaRelativa:
-    serie: pd.Series
+    """ Com um painel (várias colunas), devolve um DataFrame com as mesmas colunas; com uma série ou uma única
+    coluna, uma série chamada 'IFR'. """
+    serie: pd.Series | pd.DataFrame
+
+    def __post_init__(self):
+        self.serie = para_pandas(self.serie)
+
+    @staticmethod
+    def _rotular(indice: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+        if isinstance(indice, pd.DataFrame) and len(indice.columns) > 1:
+            return indice
+        if isinstance(indice, pd.DataFrame):
+            indice = indice.iloc[:, 0]
+        return indice.rename('IFR')
 
     def _media_simples_subidas(self, janela: int):
         subidas = self.serie.mask(self.serie > 0, 0)
@@ -47,73 +65,138 @@ class IndiceForcaRelativa:
         quedas = self.serie.mask(self.serie < 0, 0)
         return quedas.ewm(alpha=2 / (1 + janela)).mean()
 
+    @memorizar
     def simples(self, janela: int) -> pd.Series:
         """ Precisa receber os valores em porcentagem. """
         if janela <= 0:
             raise ValueError('Janela não pode ser menor ou igual a zero.')
         forca_relativa = self._media_simples_subidas(janela) / -self._media_simples_quedas(janela)
         indice = 100 - 100 / (1 + forca_relativa)
-        indice.columns = ['IFR']
-        return indice['IFR']
+        return self._rotular(indice)
 
+    @memorizar
     def exp(self, janela: int):
         """ Precisa receber os valores em porcentagem. """
         if janela <= 0:
             raise ValueError('Janela não pode ser menor ou igual a zero.')
         forca_relativa = self._media_exp_subidas(janela) / -self._media_exp_quedas(janela)
         indice = 100 - 100 / (1 + forca_relativa)
-        indice.columns = ['IFR']
-        return indice['IFR']
+        return self._rotular(indice)
 
 
-def atr(maxima: pd.Series, minima: pd.Series, fechamento: pd.Series, janela: int):
+@memorizar
+def atr(maxima: pd.Series | pd.DataFrame, minima: pd.Series | pd.DataFrame, fechamento: pd.Series | pd.DataFrame,
+        janela: int):
+    """ Aceita séries ou painéis tempo x ativos com as mesmas colunas. """
+    maxima, minima, fechamento = para_pandas(maxima), para_pandas(minima), para_pandas(fechamento)
     fechamento_anterior = fechamento.shift()
 
     maxima_para_minima = maxima - minima
     maxima_para_fechamento = np.abs(maxima - fechamento_anterior)
     minima_para_fechamento = np.abs(minima - fechamento_anterior)
-    amplitudes = pd.concat([maxima_para_minima, maxima_para_fechamento, minima_para_fechamento], axis=1)
-    amplitude_verdadeira = amplitudes.max(axis=1)
+    # Máximo elemento a elemento ignorando nulos, como o `max(axis=1)` das três colunas.
+    amplitude_verdadeira = np.fmax(np.fmax(maxima_para_minima, maxima_para_fechamento), minima_para_fechamento)
 
     return amplitude_verdadeira.rolling(janela).sum() / janela
 
 
+def _validar_janelas(janelas: list[int]) -> np.ndarray:
+    janelas = np.asarray(janelas, dtype=np.int64)
+    if janelas.ndim != 1 or (janelas <= 0).any():
+        raise ValueError('Janelas não podem ser menores ou iguais a zero.')
+    return janelas
+
+
+def banco_media_simples(serie: pd.Series, janelas: list[int]) -> np.ndarray:
+    """ `MediaMovel.simples` para várias janelas, em uma matriz tempo x janelas. Todas as janelas usam a mesma
+    soma acumulada (e a mesma contagem acumulada de nulos); janelas com algum nulo ficam nulas, como no pandas. """
+    janelas = _validar_janelas(janelas)
+    valores = np.asarray(serie, dtype=float)
+    nulos = np.isnan(valores)
+    soma = np.concatenate([[0.], np.cumsum(np.where(nulos, 0., valores))])
+    n_nulos = np.concatenate([[0], np.cumsum(nulos)])
+
+    medias = np.full((len(valores), len(janelas)), np.nan)
+    for coluna, janela in enumerate(janelas):
+        if janela > len(valores):
+            continue
+        fim = np.arange(janela, len(valores) + 1)
+        media = (soma[fim] - soma[fim - janela]) / janela
+        media[n_nulos[fim] - n_nulos[fim - janela] > 0] = np.nan
+        medias[janela - 1:, coluna] = media
+    return medias
+
+
+def banco_media_exponencial(serie: pd.Series, janelas: list[int]) -> np.ndarray:
+    """ `MediaMovel.exponencial` para várias janelas, em uma matriz tempo x janelas, com resultado idêntico. A
+    recorrência é sequencial no tempo e o `ewm` compilado do pandas já é o caminho mais rápido por janela; o
+    banco evita só a conversão e o cache de cada chamada. """
+    janelas = _validar_janelas(janelas)
+    serie = pd.Series(np.asarray(serie, dtype=float))
+    # Cada média ocupa uma linha contígua; a transposta é a matriz tempo x janelas sem cópia.
+    medias = np.empty((len(janelas), len(serie)))
+    for linha, janela in enumerate(janelas):
+        medias[linha] = serie.ewm(alpha=2 / (janela + 1), adjust=False).mean().to_numpy()
+    return medias.T
+
+
+def banco_atr(maxima: pd.Series, minima: pd.Series, fechamento: pd.Series, janelas: list[int]) -> np.ndarray:
+    """ `atr` para várias janelas, em uma matriz tempo x janelas. A amplitude verdadeira é calculada uma vez. """
+    maxima, minima = np.asarray(maxima, dtype=float), np.asarray(minima, dtype=float)
+    fechamento_anterior = np.concatenate([[np.nan], np.asarray(fechamento, dtype=float)[:-1]])
+    amplitudes = np.column_stack([maxima - minima, np.abs(maxima - fechamento_anterior),
+                                  np.abs(minima - fechamento_anterior)])
+    # Máximo ignorando nulos, como o `max(axis=1)` do pandas.
+    amplitude_verdadeira = np.fmax.reduce(amplitudes, axis=1)
+    return banco_media_simples(amplitude_verdadeira, janelas)
+
+
 @dataclass()
 class DiferencaEntreMedias:
 
-    maxima: pd.Series
-    minima: pd.Series
-    fechamento: pd.Series
+    maxima: pd.Series | pd.DataFrame
+    minima: pd.Series | pd.DataFrame
+    fechamento: pd.Series | pd.DataFrame
 
     def calcular(self,
-                 media_curta: pd.Series,
-                 media_longa: pd.Series,
+                 media_curta: pd.Series | pd.DataFrame,
+                 media_longa: pd.Series | pd.DataFrame,
                  janela_curta: int,
-                 janela_longa: int):
-        media_longa = media_longa.shift(-janela_curta)
-        dif = media_curta - media_longa
+                 janela_longa: int,
+                 janela_normalizacao: int | None = None):
+        """ Com `janela_normalizacao`, a normalização usa só os quantis das últimas observações, sem olhar o
+        futuro; sem ela, os da amostra inteira. """
+        media_longa = para_pandas(media_longa).shift(-janela_curta)
+        dif = para_pandas(media_curta) - media_longa
         atr_ = atr(self.maxima, self.minima, self.fechamento, janela=janela_longa + janela_curta)
-        atr_series = dif.values.reshape(len(media_curta)) / atr_.values
-        atr_series = pd.Series(atr_series, index=self.fechamento.index)
+        atr_series = dif.values.reshape(atr_.shape) / atr_.values
+        atr_series = para_pandas(atr_series, modelo=atr_)
+        if janela_normalizacao is not None:
+            return normalizar_movel(atr_series, janela_normalizacao)
         return normalizar(atr_series)
 
 
 class Preco:
+    """ Aceita séries ou painéis tempo x ativos com as mesmas colunas; os coeficientes de todos os ativos saem do
+    mesmo produto com os pesos. Com `janela_normalizacao`, aceleração e concavidade são reescaladas só com os
+    quantis das últimas observações, sem olhar o futuro. """
 
     def __init__(self,
-                 maxima: pd.Series,
-                 minima: pd.Series,
-                 fechamento: pd.Series,
-                 abertura: pd.Series,
+                 maxima: pd.Series | pd.DataFrame,
+                 minima: pd.Series | pd.DataFrame,
+                 fechamento: pd.Series | pd.DataFrame,
+                 abertura: pd.Series | pd.DataFrame,
                  janela: int,
-                 atr_janela: int):
-        self.maxima = maxima
-        self.minima = minima
-        self.fechamento = fechamento
-        self.abertura = abertura
+                 atr_janela: int,
+                 janela_normalizacao: int | None = None):
+        self.maxima = para_pandas(maxima)
+        self.minima = para_pandas(minima)
+        self.fechamento = para_pandas(fechamento)
+        self.abertura = para_pandas(abertura)
         self._validar_janela(janela)
         self.janela = janela
         self.atr_janela = atr_janela
+        self.janela_normalizacao = janela_normalizacao
 
     @staticmethod
     def _validar_janela(valor: float | int):
@@ -123,39 +206,43 @@ class Preco:
                                  f'a janela não pode ser negativa.')
 
     @staticmethod
-    def _obter_coef_lagrange(ordem: int, precos: pd.Series):
-
-        # Criar a series
-        x = list(range(len(precos)))
-        y = precos.tolist()
-
-        polinomio = np.polynomial.legendre.legfit(x, y, deg=ordem)
-        return polinomio[ordem - 1]
-
+    @lru_cache(maxsize=None)
+    def _obter_pesos_legendre(janela: int, ordem: int) -> np.ndarray:
+        """ Com x sempre igual a range(janela), o coeficiente de grau `ordem - 1` do ajuste de Legendre
+        (`legfit(range(janela), janela_de_precos, deg=ordem)`) é uma combinação linear fixa dos valores da janela.
+        Ajustar a identidade dá os pesos dessa combinação de uma vez. """
+        pesos = np.polynomial.legendre.legfit(np.arange(janela), np.eye(janela), deg=ordem)[ordem - 1]
+        pesos.flags.writeable = False
+        return pesos
+
+    @memorizar
     def _obter_serie_coeficientes(self, ordem: int):
         self._validar_janela(self.janela)
 
-        df = pd.concat([self.maxima, self.minima, self.abertura, self.fechamento], axis=1)
-        log_da_media = np.log(df.mean(axis=1))
-        log_da_media = log_da_media.dropna()
+        precos = [self.maxima, self.minima, self.abertura, self.fechamento]
+        if isinstance(self.fechamento, pd.DataFrame):
+            # Média das quatro cotações ignorando nulos, ativo a ativo.
+            media = sum(preco.fillna(0) for preco in precos) / sum(preco.notna() for preco in precos)
+            log_da_media = np.log(media).dropna(how='all')
+        else:
+            log_da_media = np.log(pd.concat(precos, axis=1).mean(axis=1))
+            log_da_media = log_da_media.dropna()
 
         # Caso em que todos serão nulos
         if len(log_da_media) < self.janela:
-            serie = [np.nan] * len(log_da_media)
-            return pd.Series(serie, index=log_da_media.index)
-
-        # Distâncias serão guardadas aqui.
-        coeficientes = [np.nan] * (self.janela - 1)
+            return log_da_media * np.nan
 
-        for linha in range(self.janela, len(log_da_media) + 1):
-            # Selecionando somente os dados correspondentes a janela.
-            log_da_media_janela = log_da_media.iloc[linha - self.janela:linha]
+        # Cada linha é uma janela; o coeficiente de todas sai de um único produto com os pesos.
+        janelas = np.lib.stride_tricks.sliding_window_view(log_da_media.to_numpy(dtype=float), self.janela, axis=0)
+        coeficientes = janelas @ self._obter_pesos_legendre(self.janela, ordem)
+        inicio_nulo = np.full((self.janela - 1,) + coeficientes.shape[1:], np.nan)
 
-            # Calcular o coeficiente
-            coeficiente = self._obter_coef_lagrange(precos=log_da_media_janela, ordem=ordem)
-            coeficientes.append(coeficiente)
+        return para_pandas(np.concatenate([inicio_nulo, coeficientes]), modelo=log_da_media)
 
-        return pd.Series(coeficientes, index=log_da_media.index)
+    def _reescalar(self, serie: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+        if self.janela_normalizacao is not None:
+            return reescalar_movel(serie, self.janela_normalizacao)
+        return reescalar(serie)
 
     def obter_velocidade(self) -> pd.Series:
         return self._obter_serie_coeficientes(1)
@@ -163,11 +250,11 @@ class Preco:
     def obter_aceleracao(self) -> pd.Series:
         aceleracoes = self._obter_serie_coeficientes(2)
         atr_ = atr(self.maxima, self.minima, self.fechamento, janela=self.atr_janela)
-        aceleracao_atr = pd.Series(np.array(aceleracoes) / atr_.values, index=self.fechamento.index)
-        return reescalar(aceleracao_atr)
+        aceleracao_atr = para_pandas(np.array(aceleracoes) / atr_.values, modelo=atr_)
+        return self._reescalar(aceleracao_atr)
 
     def obter_concavidade(self) -> pd.Series:
         aceleracoes = self._obter_serie_coeficientes(3)
         atr_ = atr(self.maxima, self.minima, self.fechamento, janela=self.atr_janela)
-        aceleracao_atr = pd.Series(np.array(aceleracoes) / atr_.values, index=self.fechamento.index)
-        return reescalar(aceleracao_atr)
+        aceleracao_atr = para_pandas(np.array(aceleracoes) / atr_.values, modelo=atr_)
+        return self._reescalar(aceleracao_atr)
@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 from dataclasses import dataclass
 from typing import List
 from scipy.stats.stats import jarque_bera
+from scipy.stats import chi2
+from calculadora.algebra import resolver_lote
 
 
 def _obter_r2_ajustado(r2: float, n: int, n_variaveis_independentes: int):
@@ -55,3 +58,195 @@ def regressao_linear(y: pd.Series, *xs: pd.Series):
                      modelo=regressao,
                      r2=r2,
                      r2_ajustado=_obter_r2_ajustado(r2, y.shape[0], var_independentes))
+
+
+@dataclass()
+class RegressaoMovel:
+    # Tempo x ['intercepto', variáveis independentes].
+    coeficientes: pd.DataFrame
+    r2: pd.Series
+    r2_ajustado: pd.Series
+    # Observações usadas em cada data (na regressão recursiva, a soma dos pesos).
+    n: pd.Series
+
+
+def _nomes_variaveis(xs: tuple[pd.Series, ...]) -> list:
+    return ['intercepto'] + [x.name if x.name is not None else f'x{i}' for i, x in enumerate(xs)]
+
+
+def _preparar_variaveis(y: pd.Series,
+                        xs: tuple[pd.Series, ...]) -> tuple[pd.Index, np.ndarray, np.ndarray, list, np.ndarray]:
+    """ Alinha y e xs, descarta datas com nulos e devolve o índice, a matriz [1, xs] e y. Tudo é deslocado pela
+    primeira observação: isso não muda inclinações nem R² e reduz o cancelamento das somas acumuladas. """
+    nomes = _nomes_variaveis(xs)
+    variaveis = pd.concat([*xs, y], axis=1).dropna()
+    valores = variaveis.to_numpy(dtype=float)
+    deslocamento = valores[0] if len(valores) else np.zeros(valores.shape[1])
+    valores = valores - deslocamento
+    z = np.column_stack([np.ones(len(valores)), valores[:, :-1]])
+    return variaveis.index, z, valores[:, -1], nomes, deslocamento
+
+
+def _restaurar_intercepto(coeficientes: np.ndarray, deslocamento: np.ndarray) -> np.ndarray:
+    """ Desfaz o deslocamento: a + my - b.mx. """
+    coeficientes = coeficientes.copy()
+    coeficientes[:, 0] += deslocamento[-1] - coeficientes[:, 1:] @ deslocamento[:-1]
+    return coeficientes
+
+
+def _montar_resultado(index: pd.Index, nomes: list, coeficientes: np.ndarray, sse: np.ndarray, sst: np.ndarray,
+                      n: np.ndarray, validos: np.ndarray) -> RegressaoMovel:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = 1 - sse / sst
+        r2_ajustado = _obter_r2_ajustado(r2, n, len(nomes) - 1)
+    coeficientes[~validos] = np.nan
+    r2[~validos] = np.nan
+    r2_ajustado[~validos] = np.nan
+    return RegressaoMovel(coeficientes=pd.DataFrame(coeficientes, index=index, columns=nomes),
+                          r2=pd.Series(r2, index=index, name='r2'),
+                          r2_ajustado=pd.Series(r2_ajustado, index=index, name='r2_ajustado'),
+                          n=pd.Series(n, index=index, name='n'))
+
+
+def regressao_movel(y: pd.Series, *xs: pd.Series, janela: int | None = None) -> RegressaoMovel:
+    """ Regressão linear de y em xs (com intercepto) em cada data, usando as últimas `janela` observações ou,
+    sem janela, todas até a data (expansiva).
+
+    Usa somas acumuladas de Z'Z, Z'y e y'y: cada janela é a diferença de duas somas, e todos os sistemas são
+    resolvidos de uma vez, em O(n k²) sem um estimador por janela. Datas sem observações suficientes ficam nulas.
+    A janela precisa ser maior que o número de coeficientes (intercepto incluído). """
+    index, z, y_, nomes, deslocamento = _preparar_variaveis(y, xs)
+    n_coeficientes = z.shape[1]
+    if janela is not None and janela <= n_coeficientes:
+        raise ValueError(f'A janela precisa ser maior que o número de coeficientes ({n_coeficientes}).')
+
+    def acumular(valores: np.ndarray) -> np.ndarray:
+        acumulado = np.cumsum(valores, axis=0)
+        return np.concatenate([np.zeros((1,) + valores.shape[1:]), acumulado])
+
+    zz = acumular(np.einsum('ti,tj->tij', z, z))
+    zy = acumular(z * y_[:, None])
+    yy = acumular(y_ ** 2)
+    fim = np.arange(1, len(y_) + 1)
+    inicio = np.zeros_like(fim) if janela is None else np.maximum(fim - janela, 0)
+
+    zz, zy, yy = zz[fim] - zz[inicio], zy[fim] - zy[inicio], yy[fim] - yy[inicio]
+    n = (fim - inicio).astype(float)
+    validos = n > n_coeficientes if janela is None else fim >= janela
+    # Nas datas inválidas, resolve um sistema qualquer só para manter o lote bem condicionado.
+    zz[~validos] = np.eye(n_coeficientes)
+    coeficientes = resolver_lote(zz, zy)
+
+    sse = yy - np.einsum('ti,ti->t', coeficientes, zy)
+    # zy[:, 0] é a soma de y.
+    sst = yy - zy[:, 0] ** 2 / n
+    return _montar_resultado(index, nomes, _restaurar_intercepto(coeficientes, deslocamento), sse, sst, n, validos)
+
+
+def regressao_recursiva(y: pd.Series, *xs: pd.Series, fator_esquecimento: float = 1.) -> RegressaoMovel:
+    """ Mínimos quadrados recursivos: a cada data, atualiza os coeficientes com a nova observação em O(k²).
+    Com `fator_esquecimento` < 1, o peso de cada observação passada cai por esse fator a cada data, e os
+    coeficientes acompanham relações que mudam no tempo. Com 1, equivale à regressão expansiva.
+
+    O R² é o ponderado pelos mesmos pesos, e o ajustado usa a soma dos pesos como número de observações. """
+    if not 0 < fator_esquecimento <= 1:
+        raise ValueError('O fator de esquecimento deve estar em (0, 1].')
+    index, z, y_, nomes, deslocamento = _preparar_variaveis(y, xs)
+    n_datas, n_coeficientes = z.shape
+    coeficientes = np.full((n_datas, n_coeficientes), np.nan)
+    sse, sst, n = np.full(n_datas, np.nan), np.full(n_datas, np.nan), np.zeros(n_datas)
+
+    # As primeiras observações iniciam o estado por mínimos quadrados ponderados; depois, só atualizações.
+    n_inicial = min(n_coeficientes + 1, n_datas)
+    pesos = fator_esquecimento ** np.arange(n_inicial - 1, -1, -1)
+    zz = (z[:n_inicial] * pesos[:, None]).T @ z[:n_inicial]
+    zy = (z[:n_inicial] * pesos[:, None]).T @ y_[:n_inicial]
+    soma_y, soma_yy, soma_pesos = pesos @ y_[:n_inicial], pesos @ y_[:n_inicial] ** 2, pesos.sum()
+    p = np.linalg.pinv(zz)
+    beta = p @ zy
+
+    for t in range(n_inicial - 1, n_datas):
+        if t >= n_inicial:
+            zt, yt = z[t], y_[t]
+            pz = p @ zt
+            ganho = pz / (fator_esquecimento + zt @ pz)
+            beta = beta + ganho * (yt - zt @ beta)
+            p = (p - np.outer(ganho, pz)) / fator_esquecimento
+            zy = fator_esquecimento * zy + zt * yt
+            soma_y = fator_esquecimento * soma_y + yt
+            soma_yy = fator_esquecimento * soma_yy + yt ** 2
+            soma_pesos = fator_esquecimento * soma_pesos + 1
+        coeficientes[t] = beta
+        sse[t] = soma_yy - beta @ zy
+        sst[t] = soma_yy - soma_y ** 2 / soma_pesos
+        n[t] = soma_pesos
+
+    validos = np.arange(n_datas) >= n_coeficientes
+    return _montar_resultado(index, nomes, _restaurar_intercepto(coeficientes, deslocamento), sse, sst, n, validos)
+
+
+@dataclass()
+class RegressaoMultipla:
+    # Ativos x ['intercepto', variáveis independentes].
+    coeficientes: pd.DataFrame
+    r2: pd.Series
+    r2_ajustado: pd.Series
+    # Tempo x ativos; nulo onde o ativo não tem dado.
+    residuos: pd.DataFrame
+    # Ativos x ['estatistica', 'p_valor', 'normal'].
+    jarque_bera: pd.DataFrame
+
+
+def _jarque_bera_colunas(residuos: np.ndarray, mascara: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ Teste de Jarque-Bera de cada coluna, considerando só as linhas da máscara, como o do scipy. """
+    n = mascara.sum(axis=0)
+    media = np.where(mascara, residuos, 0).sum(axis=0) / n
+    desvios = np.where(mascara, residuos - media, 0)
+    m2, m3, m4 = ((desvios ** potencia).sum(axis=0) / n for potencia in (2, 3, 4))
+    assimetria = m3 / m2 ** 1.5
+    curtose = m4 / m2 ** 2
+    estatistica = n / 6 * (assimetria ** 2 + (curtose - 3) ** 2 / 4)
+    return estatistica, chi2.sf(estatistica, 2)
+
+
+def regressao_linear_multipla(y: pd.DataFrame, *xs: pd.Series, alpha: float = 0.05) -> RegressaoMultipla:
+    """ Faz a regressão linear de cada coluna de `y` (tempo x ativos) nos mesmos `xs`, de uma vez.
+
+    Datas com algum x nulo são descartadas para todos; os nulos de cada ativo entram como máscara. Os ativos
+    sem nulos compartilham uma única fatoração QR de [1, xs]; os demais resolvem as equações normais com a
+    máscara, todos num único lote. O resultado de cada ativo é o mesmo de `regressao_linear`. """
+    nomes = _nomes_variaveis(xs)
+    xs_ = pd.concat(xs, axis=1).dropna()
+    y = y.reindex(xs_.index)
+    z = np.column_stack([np.ones(len(xs_)), xs_.to_numpy(dtype=float)])
+    valores = y.to_numpy(dtype=float)
+    mascara = ~np.isnan(valores)
+    valores_zerados = np.where(mascara, valores, 0.)
+
+    coeficientes = np.empty((valores.shape[1], z.shape[1]))
+    completos = mascara.all(axis=0)
+    if completos.any():
+        q, r = np.linalg.qr(z)
+        coeficientes[completos] = np.linalg.solve(r, q.T @ valores_zerados[:, completos]).T
+    if (~completos).any():
+        mascara_incompletos = mascara[:, ~completos].astype(float)
+        zz = np.einsum('ta,ti,tj->aij', mascara_incompletos, z, z)
+        zy = (valores_zerados[:, ~completos]).T @ z
+        coeficientes[~completos] = resolver_lote(zz, zy)
+
+    residuos = np.where(mascara, valores - z @ coeficientes.T, np.nan)
+    n = mascara.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        medias = valores_zerados.sum(axis=0) / n
+        sst = (np.where(mascara, valores - medias, 0) ** 2).sum(axis=0)
+        r2 = 1 - np.nansum(residuos ** 2, axis=0) / sst
+        r2_ajustado = _obter_r2_ajustado(r2, n, len(xs))
+        estatistica, p_valor = _jarque_bera_colunas(residuos, mascara)
+
+    return RegressaoMultipla(
+        coeficientes=pd.DataFrame(coeficientes, index=y.columns, columns=nomes),
+        r2=pd.Series(r2, index=y.columns, name='r2'),
+        r2_ajustado=pd.Series(r2_ajustado, index=y.columns, name='r2_ajustado'),
+        residuos=pd.DataFrame(residuos, index=y.index, columns=y.columns),
+        jarque_bera=pd.DataFrame({'estatistica': estatistica, 'p_valor': p_valor, 'normal': p_valor > alpha},
+                                 index=y.columns))
@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable
+import os
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class _DadosCompartilhados:
+    """ O necessário para remontar os dados num processo filho. Só os metadados são serializados. """
+    nome_memoria: str
+    formato: tuple
+    dtype: np.dtype
+    index: pd.Index | None = None
+    colunas: pd.Index | None = None
+    nome: Any = None
+
+
+# Estado de cada processo filho, preenchido uma única vez pelo inicializador.
+_funcao: Callable | None = None
+_dados: pd.Series | pd.DataFrame | np.ndarray | None = None
+_memoria: SharedMemory | None = None
+
+
+def _compartilhar(dados: pd.Series | pd.DataFrame | np.ndarray) -> tuple[SharedMemory, _DadosCompartilhados]:
+    valores = np.asarray(dados)
+    if valores.dtype.hasobject:
+        raise TypeError(f'Não é possível compartilhar dados do tipo {valores.dtype}.')
+    memoria = SharedMemory(create=True, size=max(valores.nbytes, 1))
+    np.ndarray(valores.shape, dtype=valores.dtype, buffer=memoria.buf)[...] = valores
+    if isinstance(dados, pd.Series):
+        meta = _DadosCompartilhados(memoria.name, valores.shape, valores.dtype, index=dados.index, nome=dados.name)
+    elif isinstance(dados, pd.DataFrame):
+        meta = _DadosCompartilhados(memoria.name, valores.shape, valores.dtype, index=dados.index,
+                                    colunas=dados.columns)
+    else:
+        meta = _DadosCompartilhados(memoria.name, valores.shape, valores.dtype)
+    return memoria, meta
+
+
+def _remontar(memoria: SharedMemory, meta: _DadosCompartilhados) -> pd.Series | pd.DataFrame | np.ndarray:
+    valores = np.ndarray(meta.formato, dtype=meta.dtype, buffer=memoria.buf)
+    valores.flags.writeable = False
+    if meta.colunas is not None:
+        return pd.DataFrame(valores, index=meta.index, columns=meta.colunas, copy=False)
+    if meta.index is not None:
+        return pd.Series(valores, index=meta.index, name=meta.nome, copy=False)
+    return valores
+
+
+def _inicializar(funcao: Callable, meta: _DadosCompartilhados):
+    global _funcao, _dados, _memoria
+    # O processo principal cria e libera a memória; os filhos só a anexam.
+    _memoria = SharedMemory(name=meta.nome_memoria)
+    _funcao = funcao
+    _dados = _remontar(_memoria, meta)
+
+
+def _executar(tarefa: tuple):
+    return _funcao(_dados, *tarefa)
+
+
+def mapear(funcao: Callable,
+           tarefas: Iterable[tuple],
+           dados: pd.Series | pd.DataFrame | np.ndarray,
+           n_processos: int | None = None) -> list:
+    """ Calcula `funcao(dados, *tarefa)` para cada tarefa, distribuindo as tarefas entre processos.
+
+    Os dados são copiados uma única vez para memória compartilhada e lidos (somente leitura) pelos processos,
+    em vez de serializados a cada tarefa. Os resultados voltam na mesma ordem das tarefas. `funcao` precisa
+    ser definida no nível de um módulo. Com `n_processos=1` tudo roda no processo atual. """
+    tarefas = [tarefa if isinstance(tarefa, tuple) else (tarefa,) for tarefa in tarefas]
+    if n_processos == 1 or len(tarefas) <= 1:
+        return [funcao(dados, *tarefa) for tarefa in tarefas]
+
+    n_processos = n_processos or os.cpu_count() or 1
+    tamanho_lote = max(1, len(tarefas) // (4 * n_processos))
+    memoria, meta = _compartilhar(dados)
+    try:
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar,
+                                 initargs=(funcao, meta)) as executor:
+            return list(executor.map(_executar, tarefas, chunksize=tamanho_lote))
+    finally:
+        memoria.close()
+        memoria.unlink()
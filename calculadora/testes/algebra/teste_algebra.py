@@ -0,0 +1,16 @@
+import numpy as np
+from calculadora.algebra import resolver_lote
+
+
+def teste_resolver_lote_igual_solve():
+    rng = np.random.default_rng(0)
+    matrizes = rng.normal(size=(5, 3, 3))
+    vetores = rng.normal(size=(5, 3))
+    esperado = [np.linalg.solve(matriz, vetor) for matriz, vetor in zip(matrizes, vetores)]
+    np.testing.assert_allclose(resolver_lote(matrizes, vetores), esperado)
+
+
+def teste_resolver_lote_singular_usa_pseudo_inversa():
+    matrizes = np.stack([np.eye(2), np.ones((2, 2))])
+    vetores = np.array([[1., 2.], [2., 2.]])
+    np.testing.assert_allclose(resolver_lote(matrizes, vetores), [[1., 2.], [1., 1.]])
@@ -0,0 +1,85 @@
+import gc
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.cache import CacheIndicadores, ativar_cache, desativar_cache
+from calculadora.indicadores.tendencia import MediaMovel, atr
+
+serie = pd.Series(np.linspace(10, 20, 50), index=pd.date_range('2022-01-01', periods=50, freq='D'))
+
+
+@pytest.fixture()
+def cache():
+    cache = ativar_cache()
+    yield cache
+    desativar_cache()
+
+
+def teste_cache_acerto_devolve_mesmo_resultado(cache):
+    primeira = MediaMovel.exponencial(serie, window=5)
+    segunda = MediaMovel.exponencial(serie, 5)
+    pd.testing.assert_series_equal(primeira, segunda)
+    assert cache.estatisticas.acertos == 1 and cache.estatisticas.falhas == 1
+
+
+def teste_cache_parametros_e_series_diferentes(cache):
+    MediaMovel.simples(serie, window=5)
+    MediaMovel.simples(serie, window=6)
+    copia = serie.copy()
+    MediaMovel.simples(copia, window=5)
+    assert cache.estatisticas.acertos == 0 and cache.estatisticas.itens == 3
+
+
+def teste_cache_coluna_selecionada_de_novo(cache):
+    dados = pd.DataFrame({'Fechamento': serie, 'Volume': np.arange(len(serie)), 'Ticker': 'X'})
+    primeira = MediaMovel.exponencial(dados['Fechamento'], 10)
+    segunda = MediaMovel.exponencial(dados['Fechamento'], 10)
+    pd.testing.assert_series_equal(primeira, segunda)
+    assert cache.estatisticas.acertos == 1
+    MediaMovel.exponencial(dados['Volume'], 10)
+    assert cache.estatisticas.acertos == 1 and cache.estatisticas.itens == 2
+
+
+def teste_cache_descarta_entrada_de_serie_coletada(cache):
+    temporaria = serie * 2
+    MediaMovel.simples(temporaria, window=5)
+    assert cache.estatisticas.itens == 1
+    del temporaria
+    gc.collect()
+    assert cache.estatisticas.itens == 0 and cache.estatisticas.bytes_ocupados == 0
+
+
+def teste_cache_percebe_alteracao_no_lugar(cache):
+    alterada = serie.copy()
+    antes = MediaMovel.simples(alterada, window=5)
+    alterada.iloc[25] += 1
+    depois = MediaMovel.simples(alterada, window=5)
+    assert cache.estatisticas.acertos == 0
+    assert depois.iloc[25] == antes.iloc[25] + 0.2
+
+
+def teste_cache_devolve_copia(cache):
+    media = MediaMovel.simples(serie, window=5)
+    media.iloc[-1] = -1
+    assert MediaMovel.simples(serie, window=5).iloc[-1] == serie.iloc[-5:].mean()
+
+
+def teste_cache_funcao(cache):
+    atr(serie + 1, serie - 1, serie, janela=3)
+    maxima, minima = serie + 1, serie - 1
+    atr(maxima, minima, serie, janela=3)
+    atr(maxima, minima, serie, janela=3)
+    assert cache.estatisticas.acertos == 1
+
+
+def teste_cache_remove_menos_usado():
+    cache = CacheIndicadores(tamanho_maximo_bytes=2 * serie.nbytes + 2 * serie.index.nbytes)
+    for chave in ('a', 'b', 'c'):
+        cache.guardar((chave,), serie)
+    assert cache.obter(('a',))[0] is False and cache.obter(('c',))[0] is True
+    assert cache.estatisticas.remocoes == 1 and cache.estatisticas.itens == 2
+
+
+def teste_cache_desativado_nao_guarda():
+    desativar_cache()
+    pd.testing.assert_series_equal(MediaMovel.simples(serie, 3), serie.rolling(3).mean())
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.incrementais import (MediaSimplesIncremental, MediaExponencialIncremental,
+                                                  IndiceForcaRelativaIncremental, ATRIncremental,
+                                                  SharpeMovelIncremental, DrawdownIncremental)
+from calculadora.indicadores.performance import drawdown, indice_de_sharpe_movel
+from calculadora.indicadores.tendencia import MediaMovel, IndiceForcaRelativa, atr
+
+
+@pytest.fixture(scope='module')
+def fechamento(gerar_precos):
+    return gerar_precos(200, semente=11, inicio='2021-01-01')
+
+
+@pytest.fixture(scope='module')
+def fechamento_com_nulos(fechamento):
+    # Alguns buracos para conferir o tratamento de nulos.
+    com_nulos = fechamento.copy()
+    com_nulos.iloc[[0, 40, 41, 120]] = np.nan
+    return com_nulos
+
+
+@pytest.fixture(scope='module')
+def maxima_e_minima(fechamento):
+    gerador = np.random.default_rng(12)
+    return (fechamento * (1 + gerador.uniform(0, 0.02, len(fechamento))),
+            fechamento * (1 - gerador.uniform(0, 0.02, len(fechamento))))
+
+
+def _alimentar(indicador, *series) -> np.ndarray:
+    return np.array([indicador.atualizar(*valores) for valores in zip(*series)])
+
+
+def teste_media_simples_incremental(fechamento, fechamento_com_nulos):
+    for serie in (fechamento, fechamento_com_nulos):
+        np.testing.assert_allclose(_alimentar(MediaSimplesIncremental(10), serie),
+                                   MediaMovel.simples(serie, window=10).values, rtol=1e-10)
+
+
+def teste_media_exponencial_incremental(fechamento, fechamento_com_nulos):
+    for serie in (fechamento, fechamento_com_nulos):
+        for janela in (3, 10):
+            np.testing.assert_array_equal(_alimentar(MediaExponencialIncremental(janela), serie),
+                                          MediaMovel.exponencial(serie, window=janela).values)
+
+
+def teste_ifr_incremental(fechamento_com_nulos):
+    retornos = fechamento_com_nulos.pct_change() * 100
+    ifr = IndiceForcaRelativa(retornos.to_frame())
+    np.testing.assert_allclose(_alimentar(IndiceForcaRelativaIncremental(14), retornos),
+                               ifr.simples(14).values, rtol=1e-9)
+    np.testing.assert_allclose(_alimentar(IndiceForcaRelativaIncremental(14, exponencial=True), retornos),
+                               ifr.exp(14).values, rtol=1e-9)
+
+
+def teste_atr_incremental(fechamento, maxima_e_minima):
+    maxima, minima = maxima_e_minima
+    np.testing.assert_allclose(_alimentar(ATRIncremental(14), maxima, minima, fechamento),
+                               atr(maxima, minima, fechamento, janela=14).values, rtol=1e-10)
+
+
+def teste_sharpe_movel_incremental(fechamento_com_nulos):
+    retornos = fechamento_com_nulos.pct_change()
+    livre_risco = pd.Series(0.0002, index=fechamento_com_nulos.index)
+    np.testing.assert_allclose(_alimentar(SharpeMovelIncremental(20), retornos, livre_risco),
+                               indice_de_sharpe_movel(livre_risco, retornos, janela=20).values, rtol=1e-8)
+
+
+def teste_drawdown_incremental(fechamento, fechamento_com_nulos):
+    for serie in (fechamento, fechamento_com_nulos):
+        np.testing.assert_allclose(_alimentar(DrawdownIncremental(30), serie), drawdown(30, serie).values,
+                                   rtol=1e-12)
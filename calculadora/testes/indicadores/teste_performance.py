@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.performance import drawdown, indice_de_sharpe_movel, tabela_de_desempenho
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(101, semente=8, colunas=['A', 'B', 'C'], inicio='2021-01-01')
+
+
+@pytest.fixture(scope='module')
+def retornos(precos):
+    return precos.pct_change().iloc[1:]
+
+
+@pytest.fixture(scope='module')
+def livre_risco(retornos):
+    return pd.Series(0.0002, index=retornos.index)
+
+
+def teste_drawdown_painel(precos):
+    esperado = pd.DataFrame({ativo: drawdown(20, precos[ativo]) for ativo in precos.columns})
+    pd.testing.assert_frame_equal(drawdown(20, precos), esperado)
+
+
+def teste_sharpe_movel_painel(retornos, livre_risco):
+    esperado = pd.DataFrame({ativo: indice_de_sharpe_movel(livre_risco, retornos[ativo], 20)
+                             for ativo in retornos.columns})
+    pd.testing.assert_frame_equal(indice_de_sharpe_movel(livre_risco, retornos, 20), esperado)
+    np.testing.assert_allclose(indice_de_sharpe_movel(livre_risco.values, retornos.values, 20).values,
+                               esperado.values)
+    # Taxa em array com o painel datado: descontada por posição, sem alinhar índices.
+    pd.testing.assert_frame_equal(indice_de_sharpe_movel(livre_risco.values, retornos, 20), esperado)
+
+
+def teste_sharpe_movel_array_com_taxa_datada(retornos, livre_risco):
+    # Retornos em array e taxa com datas: desconto por posição, com as datas da taxa.
+    painel = indice_de_sharpe_movel(livre_risco, retornos.values, 20)
+    np.testing.assert_allclose(painel.values, indice_de_sharpe_movel(livre_risco, retornos, 20).values)
+    assert painel.index.equals(retornos.index) and painel.iloc[19:].notna().all().all()
+    serie = indice_de_sharpe_movel(livre_risco, retornos['A'].values, 20)
+    np.testing.assert_allclose(serie.values, indice_de_sharpe_movel(livre_risco, retornos['A'], 20).values)
+
+
+def teste_tabela_de_desempenho_igual_por_curva(precos):
+    tabela = tabela_de_desempenho(precos, tamanho_lote=2)
+    for ativo in precos.columns:
+        curva = precos[ativo]
+        r = curva.pct_change().dropna()
+        linha = tabela.loc[ativo]
+        np.testing.assert_allclose(linha['cagr'], (curva.iloc[-1] / curva.iloc[0]) ** (252 / len(r)) - 1)
+        np.testing.assert_allclose(linha['volatilidade'], r.std() * np.sqrt(252))
+        np.testing.assert_allclose(linha['sharpe'], r.mean() / r.std() * np.sqrt(252))
+        np.testing.assert_allclose(linha['sortino'], r.mean() / np.sqrt((r.clip(upper=0) ** 2).mean()) * np.sqrt(252))
+        np.testing.assert_allclose(linha['max_drawdown'], (curva / curva.cummax() - 1).min())
+        np.testing.assert_allclose(linha['acerto'], (r > 0).mean())
+    assert list(tabela['sharpe']) == sorted(tabela['sharpe'], reverse=True)
+
+
+def teste_tabela_de_desempenho_duracao_e_giro():
+    curvas = np.array([[1., 1.], [1.1, 1.], [1., 1.2], [1.05, 1.3], [1.2, 1.1], [1.2, 1.1]])
+    exposicoes = np.array([[0., 1.], [1., 1.], [1., 1.], [0., 1.], [0., 1.], [0., 1.]])
+    tabela = tabela_de_desempenho(curvas, periodos_por_ano=5, exposicoes=exposicoes).sort_index()
+    assert tabela['duracao_max_drawdown'].tolist() == [2, 2]
+    np.testing.assert_allclose(tabela['giro'], [2., 0.])
+    np.testing.assert_allclose(tabela['acerto'], [3 / 4, 2 / 3])
+
+
+def teste_tabela_de_desempenho_sem_curvas(precos):
+    tabela = tabela_de_desempenho(pd.DataFrame(index=precos.index))
+    assert tabela.empty and 'sharpe' in tabela.columns
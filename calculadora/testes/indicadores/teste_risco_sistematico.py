@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.risco_sistematico import AbsortionRatio, Mahalanobis
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(120, semente=17, colunas=['A', 'B', 'C', 'D'])
+
+
+def _mahalanobis_referencia(precos: pd.DataFrame, janela: int, covariancia_movel: bool) -> np.ndarray:
+    df = precos.pct_change().dropna()
+    cov_inv = np.linalg.pinv(df.cov().values)
+    serie = [np.nan] * (janela - 1)
+    for linha in range(janela, len(df) + 1):
+        df_janela = df.iloc[linha - janela:linha]
+        if covariancia_movel:
+            cov_inv = np.linalg.pinv(df_janela.cov().values)
+        centralizada = (df.iloc[linha - 1] - df_janela.mean()).values
+        serie.append(centralizada @ cov_inv @ centralizada)
+    return np.array(serie)
+
+
+def teste_mahalanobis_igual_referencia(precos):
+    serie = Mahalanobis(precos).obter_serie(janela=30)
+    np.testing.assert_allclose(serie.values, _mahalanobis_referencia(precos, 30, False), rtol=1e-8)
+
+
+def teste_mahalanobis_covariancia_movel(precos):
+    serie = Mahalanobis(precos).obter_serie(janela=30, covariancia_movel=True)
+    np.testing.assert_allclose(serie.values, _mahalanobis_referencia(precos, 30, True), rtol=1e-7)
+
+
+def teste_mahalanobis_janela_maior_que_serie(precos):
+    assert Mahalanobis(precos).obter_serie(janela=500).isna().all()
+
+
+def _absortion_ratio_referencia(precos: pd.DataFrame, janela: int, pct_relevante: float = 0.2) -> np.ndarray:
+    df = precos.pct_change().dropna()
+    serie = [np.nan] * (janela - 1)
+    for linha in range(janela, len(df) + 1):
+        df_janela = df.iloc[linha - janela:linha]
+        autovalores = pd.Series(np.linalg.eig(df_janela.cov())[0]).sort_values(ascending=False).reset_index(drop=True)
+        relevantes = autovalores[autovalores.index <= pct_relevante * len(autovalores)]
+        serie.append(relevantes.sum() / df_janela.var().sum())
+    return np.array(serie)
+
+
+def teste_absortion_ratio_igual_referencia(precos):
+    serie = AbsortionRatio(precos).obter(janela=30)
+    np.testing.assert_allclose(serie.values, _absortion_ratio_referencia(precos, 30), rtol=1e-10)
+
+
+def teste_absortion_ratio_lotes_pequenos_e_processos(precos):
+    serie = AbsortionRatio(precos).obter(janela=30, memoria_maxima=10_000, n_processos=2)
+    np.testing.assert_allclose(serie.values, _absortion_ratio_referencia(precos, 30), rtol=1e-10)
+
+
+def teste_absortion_ratio_pct_relevante_e_dif(precos):
+    serie = AbsortionRatio(precos).obter(janela=30, pct_relevante=0.4)
+    np.testing.assert_allclose(serie.values, _absortion_ratio_referencia(precos, 30, pct_relevante=0.4), rtol=1e-10)
+    dif = AbsortionRatio(precos).obter_dif(janela=30, pct_relevante=0.4)
+    pd.testing.assert_series_equal(dif, serie - serie.shift(1))
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import (Preco, MediaMovel, IndiceForcaRelativa, DiferencaEntreMedias, atr,
+                                               banco_media_simples, banco_media_exponencial, banco_atr)
+
+
+@pytest.fixture(scope='module')
+def ohlc(gerar_precos):
+    fechamento = gerar_precos(80, semente=5, inicio='2021-01-01', preco_inicial=50.)
+    abertura = fechamento.shift(1).fillna(fechamento.iloc[0])
+    return {'maxima': np.maximum(abertura, fechamento) * 1.01, 'minima': np.minimum(abertura, fechamento) * 0.99,
+            'fechamento': fechamento, 'abertura': abertura}
+
+
+def _coeficientes_referencia(ohlc: dict, janela: int, ordem: int) -> np.ndarray:
+    log_da_media = np.log(pd.concat([ohlc['maxima'], ohlc['minima'], ohlc['abertura'], ohlc['fechamento']],
+                                    axis=1).mean(axis=1))
+    coeficientes = [np.nan] * (janela - 1)
+    for linha in range(janela, len(log_da_media) + 1):
+        y = log_da_media.iloc[linha - janela:linha].tolist()
+        coeficientes.append(np.polynomial.legendre.legfit(list(range(janela)), y, deg=ordem)[ordem - 1])
+    return np.array(coeficientes)
+
+
+def teste_coeficientes_iguais_ao_ajuste_por_janela(ohlc):
+    preco = Preco(ohlc['maxima'], ohlc['minima'], ohlc['fechamento'], ohlc['abertura'], janela=15, atr_janela=10)
+    for ordem in (1, 2, 3):
+        np.testing.assert_allclose(preco._obter_serie_coeficientes(ordem).values,
+                                   _coeficientes_referencia(ohlc, 15, ordem), rtol=1e-7, atol=1e-12)
+
+
+def teste_coeficientes_janela_maior_que_serie(ohlc):
+    preco = Preco(ohlc['maxima'], ohlc['minima'], ohlc['fechamento'], ohlc['abertura'], janela=500, atr_janela=10)
+    assert preco.obter_velocidade().isna().all()
+
+
+janelas = [3, 10, 25, 79, 100]
+
+
+@pytest.fixture(scope='module')
+def fechamentos(ohlc):
+    """ O fechamento com e sem nulos. """
+    com_nulos = ohlc['fechamento'].copy()
+    com_nulos.iloc[[0, 30, 31]] = np.nan
+    return ohlc['fechamento'], com_nulos
+
+
+def teste_banco_media_exponencial_identico(fechamentos):
+    for serie in fechamentos:
+        banco = banco_media_exponencial(serie, janelas)
+        esperado = np.column_stack([MediaMovel.exponencial(serie, window=janela).values for janela in janelas])
+        np.testing.assert_array_equal(banco, esperado)
+
+
+def teste_banco_media_simples(fechamentos):
+    for serie in fechamentos:
+        banco = banco_media_simples(serie, janelas)
+        esperado = np.column_stack([MediaMovel.simples(serie, window=janela).values for janela in janelas])
+        np.testing.assert_allclose(banco, esperado, rtol=1e-12)
+
+
+def teste_banco_atr(ohlc):
+    maxima, minima, fechamento = ohlc['maxima'], ohlc['minima'], ohlc['fechamento']
+    banco = banco_atr(maxima, minima, fechamento, janelas)
+    esperado = np.column_stack([atr(maxima, minima, fechamento, janela=janela).values for janela in janelas])
+    np.testing.assert_allclose(banco, esperado, rtol=1e-12)
+
+
+ativos = ['A', 'B', 'C']
+
+
+@pytest.fixture(scope='module')
+def painel(gerar_precos):
+    fechamentos = gerar_precos(80, semente=6, colunas=ativos, inicio='2021-01-01', preco_inicial=50.)
+    return {'maxima': fechamentos * 1.01, 'minima': fechamentos * 0.99,
+            'fechamento': fechamentos, 'abertura': fechamentos.shift(1)}
+
+
+def _por_coluna(painel: dict, calcular) -> pd.DataFrame:
+    return pd.DataFrame({ativo: calcular({nome: df[ativo] for nome, df in painel.items()}) for ativo in ativos})
+
+
+def teste_painel_medias_e_atr(painel):
+    fechamentos = painel['fechamento']
+    pd.testing.assert_frame_equal(MediaMovel.exponencial(fechamentos, window=10),
+                                  _por_coluna(painel, lambda p: MediaMovel.exponencial(p['fechamento'], window=10)))
+    np.testing.assert_array_equal(MediaMovel.simples(fechamentos.values, window=10).values,
+                                  _por_coluna(painel, lambda p: MediaMovel.simples(p['fechamento'], 10)).values)
+    pd.testing.assert_frame_equal(atr(painel['maxima'], painel['minima'], fechamentos, janela=7),
+                                  _por_coluna(painel,
+                                              lambda p: atr(p['maxima'], p['minima'], p['fechamento'], janela=7)))
+
+
+def teste_painel_ifr(painel):
+    retornos = painel['fechamento'].pct_change() * 100
+    pd.testing.assert_frame_equal(IndiceForcaRelativa(retornos).simples(14),
+                                  pd.DataFrame({ativo: IndiceForcaRelativa(retornos[ativo]).simples(14)
+                                                for ativo in ativos}))
+    assert IndiceForcaRelativa(retornos['A']).exp(14).name == 'IFR'
+
+
+def teste_painel_preco(painel):
+    preco = Preco(painel['maxima'], painel['minima'], painel['fechamento'], painel['abertura'], janela=15,
+                  atr_janela=10)
+    esperado = _por_coluna(painel, lambda p: Preco(p['maxima'], p['minima'], p['fechamento'], p['abertura'],
+                                                   janela=15, atr_janela=10).obter_aceleracao())
+    pd.testing.assert_frame_equal(preco.obter_aceleracao(), esperado)
+
+
+def teste_painel_diferenca_entre_medias(painel):
+    curta, longa = MediaMovel.exponencial(painel['fechamento'], 5), MediaMovel.exponencial(painel['fechamento'], 20)
+    diferenca = DiferencaEntreMedias(painel['maxima'], painel['minima'], painel['fechamento'])
+    esperado = _por_coluna(painel, lambda p: DiferencaEntreMedias(p['maxima'], p['minima'], p['fechamento']).calcular(
+        MediaMovel.exponencial(p['fechamento'], 5), MediaMovel.exponencial(p['fechamento'], 20), 5, 20))
+    pd.testing.assert_frame_equal(diferenca.calcular(curta, longa, 5, 20), esperado)
+
+
+def teste_preco_normalizacao_movel_nao_olha_o_futuro(painel):
+    alterado = {nome: df.copy() for nome, df in painel.items()}
+    for df in alterado.values():
+        df.iloc[60:] *= 3
+    aceleracoes = [Preco(p['maxima'], p['minima'], p['fechamento'], p['abertura'], janela=10, atr_janela=5,
+                         janela_normalizacao=20).obter_aceleracao() for p in (painel, alterado)]
+    pd.testing.assert_frame_equal(aceleracoes[0].iloc[:59], aceleracoes[1].iloc[:59])
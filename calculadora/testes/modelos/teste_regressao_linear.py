@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import jarque_bera
+from calculadora.modelos.regressao_linear import (regressao_linear, regressao_linear_multipla, regressao_movel,
+                                                  regressao_recursiva)
+
+dias = pd.date_range('2021-01-01', periods=150, freq='D')
+_gerador = np.random.default_rng(4)
+mercado = pd.Series(_gerador.normal(0, 0.01, len(dias)), index=dias, name='mercado')
+dolar = pd.Series(_gerador.normal(0, 0.01, len(dias)), index=dias, name='dolar')
+beta = np.linspace(0.5, 1.5, len(dias))
+ativo = pd.Series(0.001 + beta * mercado - 0.3 * dolar + _gerador.normal(0, 0.005, len(dias)), index=dias)
+ativo.iloc[10] = np.nan
+
+
+def _conferir(resultado, data, y: pd.Series, *xs: pd.Series):
+    esperado = regressao_linear(y, *xs)
+    np.testing.assert_allclose(resultado.coeficientes.loc[data].values[1:], np.ravel(esperado.coeficientes),
+                               rtol=1e-8)
+    np.testing.assert_allclose(resultado.coeficientes.loc[data, 'intercepto'], esperado.modelo.intercept_[0],
+                               rtol=1e-8)
+    np.testing.assert_allclose(resultado.r2.loc[data], esperado.r2, rtol=1e-8)
+    np.testing.assert_allclose(resultado.r2_ajustado.loc[data], esperado.r2_ajustado, rtol=1e-8)
+
+
+def teste_regressao_movel_igual_regressao_por_janela():
+    resultado = regressao_movel(ativo, mercado, dolar, janela=30)
+    validos = ativo.dropna().index
+    assert resultado.coeficientes.iloc[:29].isna().all().all()
+    for fim in (30, 31, 80, len(validos)):
+        janela = validos[fim - 30:fim]
+        _conferir(resultado, validos[fim - 1], ativo[janela], mercado[janela], dolar[janela])
+
+
+def teste_regressao_movel_janela_pequena_demais():
+    # Três coeficientes (intercepto, mercado e dólar): janelas de até três observações não determinam o ajuste.
+    for janela in (0, 2, 3):
+        with pytest.raises(ValueError):
+            regressao_movel(ativo, mercado, dolar, janela=janela)
+    assert regressao_movel(ativo, mercado, dolar, janela=4).coeficientes.iloc[3:].notna().all().all()
+
+
+def teste_regressao_expansiva_e_recursiva():
+    expansiva = regressao_movel(ativo, mercado, dolar)
+    recursiva = regressao_recursiva(ativo, mercado, dolar)
+    validos = ativo.dropna().index
+    for fim in (4, 50, len(validos)):
+        _conferir(expansiva, validos[fim - 1], ativo[validos[:fim]], mercado[validos[:fim]], dolar[validos[:fim]])
+    assert expansiva.coeficientes.iloc[:3].isna().all().all()
+    pd.testing.assert_frame_equal(recursiva.coeficientes, expansiva.coeficientes, rtol=1e-7)
+    pd.testing.assert_series_equal(recursiva.r2, expansiva.r2, rtol=1e-7)
+
+
+def teste_regressao_recursiva_com_esquecimento():
+    fator = 0.97
+    resultado = regressao_recursiva(ativo, mercado, fator_esquecimento=fator)
+    dados = pd.concat([mercado, ativo], axis=1).dropna()
+    pesos = np.sqrt(fator ** np.arange(len(dados) - 1, -1, -1))
+    z = np.column_stack([np.ones(len(dados)), dados.iloc[:, 0]])
+    esperado = np.linalg.lstsq(z * pesos[:, None], dados.iloc[:, 1] * pesos, rcond=None)[0]
+    np.testing.assert_allclose(resultado.coeficientes.iloc[-1].values, esperado, rtol=1e-8)
+    # O beta recente fica mais perto do verdadeiro (1.5) que o da regressão na amostra toda.
+    assert abs(resultado.coeficientes['mercado'].iloc[-1] - 1.5) < \
+           abs(regressao_movel(ativo, mercado).coeficientes['mercado'].iloc[-1] - 1.5)
+
+
+def teste_regressao_multipla_igual_regressao_por_ativo():
+    ativos = pd.DataFrame({f'ativo{i}': 0.001 * i + (0.5 + i / 4) * mercado - 0.1 * i * dolar +
+                           pd.Series(_gerador.standard_t(4 + i, len(dias)) * 0.005, index=dias) for i in range(4)})
+    ativos.iloc[[3, 7, 50], 1] = np.nan
+    ativos.iloc[:20, 3] = np.nan
+    resultado = regressao_linear_multipla(ativos, mercado, dolar)
+    for ativo in ativos.columns:
+        esperado = regressao_linear(ativos[ativo], mercado, dolar)
+        np.testing.assert_allclose(resultado.coeficientes.loc[ativo].values,
+                                   [esperado.modelo.intercept_[0], *np.ravel(esperado.coeficientes)], rtol=1e-8)
+        np.testing.assert_allclose(resultado.r2[ativo], esperado.r2, rtol=1e-8)
+        np.testing.assert_allclose(resultado.r2_ajustado[ativo], esperado.r2_ajustado, rtol=1e-8)
+        residuos = esperado.residuos(ativos[ativo]).dropna()
+        np.testing.assert_allclose(resultado.residuos[ativo].dropna().values, residuos.values, atol=1e-12)
+        teste = jarque_bera(residuos)
+        np.testing.assert_allclose(resultado.jarque_bera.loc[ativo, ['estatistica', 'p_valor']].to_numpy(float),
+                                   [teste.statistic, teste.pvalue], rtol=1e-7)
+    assert resultado.residuos.iloc[:20, 3].isna().all()
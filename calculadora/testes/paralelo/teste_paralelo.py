@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from calculadora.paralelo import mapear
+
+serie = pd.Series(np.arange(100, dtype=float), index=pd.date_range('2022-01-01', periods=100), name='Fechamento')
+
+
+def _media_movel_final(dados: pd.Series, janela: int, deslocamento: int = 0):
+    return dados.rolling(janela).mean().iloc[-1] + deslocamento
+
+
+def teste_mapear_mesma_ordem_que_serial():
+    tarefas = [(janela, janela % 3) for janela in range(2, 30)]
+    serial = mapear(_media_movel_final, tarefas, serie, n_processos=1)
+    paralelo = mapear(_media_movel_final, tarefas, serie, n_processos=2)
+    assert paralelo == serial
+
+
+def teste_mapear_recebe_series_com_index():
+    def _nome_e_index(dados, _):
+        return dados.name, dados.index[0]
+    assert mapear(_nome_e_index, [1], serie, n_processos=1) == [('Fechamento', serie.index[0])]
+
+
+def _soma_linha(dados: np.ndarray, linha: int):
+    return dados[linha].sum()
+
+
+def teste_mapear_array_2d():
+    dados = np.arange(12, dtype=float).reshape(3, 4)
+    assert mapear(_soma_linha, [0, 1, 2], dados, n_processos=2) == [6, 22, 38]
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='session')
+def gerar_precos():
+    """ Gera preços sintéticos diários: passeio aleatório geométrico com retornos normais de desvio 2%, a partir de
+    `inicio`. Com `colunas`, devolve um DataFrame tempo x ativos. A mesma semente dá sempre os mesmos preços. """
+
+    def gerar(n_dias: int, semente: int, colunas: list[str] | None = None, inicio: str = '2020-01-01',
+              preco_inicial: float = 100.) -> pd.Series | pd.DataFrame:
+        dias = pd.date_range(inicio, periods=n_dias, freq='D')
+        formato = n_dias if colunas is None else (n_dias, len(colunas))
+        precos = preco_inicial * np.exp(np.cumsum(np.random.default_rng(semente).normal(0, 0.02, formato), axis=0))
+        if colunas is None:
+            return pd.Series(precos, index=dias)
+        return pd.DataFrame(precos, index=dias, columns=colunas)
+
+    return gerar
@@ -0,0 +1,195 @@
+from functools import partial
+import math
+import numpy as np
+import scipy
+from calculadora.paralelo import mapear
+
+
+class EsbocosIncompativeis(Exception):
+    pass
+
+
+class _Baldes:
+    """ Contagens de baldes consecutivos, guardadas num array a partir da chave `deslocamento`. """
+
+    def __init__(self):
+        self.contagens = np.zeros(0, dtype=np.int64)
+        self.deslocamento = 0
+
+    def _cobrir(self, minima: int, maxima: int):
+        if not len(self.contagens):
+            self.contagens = np.zeros(maxima - minima + 1, dtype=np.int64)
+            self.deslocamento = minima
+            return
+        inicio = min(minima, self.deslocamento)
+        fim = max(maxima, self.deslocamento + len(self.contagens) - 1)
+        if inicio == self.deslocamento and fim == self.deslocamento + len(self.contagens) - 1:
+            return
+        contagens = np.zeros(fim - inicio + 1, dtype=np.int64)
+        contagens[self.deslocamento - inicio:self.deslocamento - inicio + len(self.contagens)] = self.contagens
+        self.contagens, self.deslocamento = contagens, inicio
+
+    def adicionar(self, chave: int):
+        self._cobrir(chave, chave)
+        self.contagens[chave - self.deslocamento] += 1
+
+    def adicionar_varias(self, chaves: np.ndarray):
+        if not len(chaves):
+            return
+        minima, maxima = int(chaves.min()), int(chaves.max())
+        self._cobrir(minima, maxima)
+        self.contagens += np.bincount(chaves - self.deslocamento, minlength=len(self.contagens))
+
+    def juntar(self, outros: '_Baldes'):
+        if not len(outros.contagens):
+            return
+        self._cobrir(outros.deslocamento, outros.deslocamento + len(outros.contagens) - 1)
+        inicio = outros.deslocamento - self.deslocamento
+        self.contagens[inicio:inicio + len(outros.contagens)] += outros.contagens
+
+    def limitar(self, max_baldes: int):
+        """ Junta os baldes de menor chave (menor módulo) no primeiro que sobra, para manter a memória fixa. """
+        excesso = len(self.contagens) - max_baldes
+        if excesso > 0:
+            self.contagens[excesso] += self.contagens[:excesso].sum()
+            self.contagens = self.contagens[excesso:].copy()
+            self.deslocamento += excesso
+
+
+class EsbocoQuantis:
+    """ Esboço de quantis com erro relativo garantido, no estilo do DDSketch: cada valor cai num balde
+    logarítmico, e o quantil devolvido fica a menos de `erro_relativo` (relativo) do valor verdadeiro daquela
+    posição. A memória não depende do número de valores, só da faixa de magnitudes (e fica limitada a
+    `max_baldes` por sinal, perdendo precisão nos valores de menor módulo).
+
+    Esboços com o mesmo `erro_relativo` podem ser juntados: o resultado é o mesmo que teria um único esboço com
+    todos os valores, então pedaços de um histórico longo podem ser processados separadamente. """
+
+    # Abaixo disso o valor conta como zero.
+    MENOR_MODULO = 1e-12
+
+    def __init__(self, erro_relativo: float = 0.01, max_baldes: int = 2048):
+        if not 0 < erro_relativo < 1:
+            raise ValueError('O erro relativo deve estar em (0, 1).')
+        self.erro_relativo = erro_relativo
+        self.max_baldes = max_baldes
+        self._gama = (1 + erro_relativo) / (1 - erro_relativo)
+        self._log_gama = math.log(self._gama)
+        self._positivos = _Baldes()
+        self._negativos = _Baldes()
+        self._zeros = 0
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _chave(self, modulo: float) -> int:
+        return math.ceil(math.log(modulo) / self._log_gama)
+
+    def adicionar(self, valor: float):
+        """ Valores nulos são ignorados. """
+        if valor != valor:
+            return
+        if valor > self.MENOR_MODULO:
+            self._positivos.adicionar(self._chave(valor))
+            self._positivos.limitar(self.max_baldes)
+        elif valor < -self.MENOR_MODULO:
+            self._negativos.adicionar(self._chave(-valor))
+            self._negativos.limitar(self.max_baldes)
+        else:
+            self._zeros += 1
+        self.n += 1
+
+    def adicionar_varios(self, valores: np.ndarray):
+        """ Mesmo efeito de `adicionar` para cada valor, com operações vetorizadas. """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        positivos = valores[valores > self.MENOR_MODULO]
+        negativos = -valores[valores < -self.MENOR_MODULO]
+        self._positivos.adicionar_varias(np.ceil(np.log(positivos) / self._log_gama).astype(np.int64))
+        self._negativos.adicionar_varias(np.ceil(np.log(negativos) / self._log_gama).astype(np.int64))
+        self._positivos.limitar(self.max_baldes)
+        self._negativos.limitar(self.max_baldes)
+        self._zeros += len(valores) - len(positivos) - len(negativos)
+        self.n += len(valores)
+
+    def juntar(self, outro: 'EsbocoQuantis') -> 'EsbocoQuantis':
+        """ Acrescenta os valores de `outro` a este esboço e o devolve. """
+        if outro.erro_relativo != self.erro_relativo:
+            raise EsbocosIncompativeis('Só é possível juntar esboços com o mesmo erro relativo.')
+        self._positivos.juntar(outro._positivos)
+        self._negativos.juntar(outro._negativos)
+        self._positivos.limitar(self.max_baldes)
+        self._negativos.limitar(self.max_baldes)
+        self._zeros += outro._zeros
+        self.n += outro.n
+        return self
+
+    def quantis(self, quantis: tuple[float, ...]) -> np.ndarray:
+        """ Valor aproximado da posição floor(q * (n - 1)) dos valores ordenados, para cada q. """
+        if not self.n:
+            return np.full(len(quantis), np.nan)
+        # Do mais negativo ao mais positivo: negativos em ordem decrescente de módulo, zeros, positivos.
+        contagens = np.concatenate([self._negativos.contagens[::-1], [self._zeros], self._positivos.contagens])
+        chaves_negativas = self._negativos.deslocamento + np.arange(len(self._negativos.contagens))[::-1]
+        chaves_positivas = self._positivos.deslocamento + np.arange(len(self._positivos.contagens))
+        representantes = np.concatenate([-self._representante(chaves_negativas), [0.],
+                                         self._representante(chaves_positivas)])
+        posicoes = np.floor(np.asarray(quantis, dtype=float) * (self.n - 1))
+        return representantes[np.searchsorted(np.cumsum(contagens), posicoes, side='right')]
+
+    def quantil(self, quantil: float) -> float:
+        return float(self.quantis((quantil,))[0])
+
+    def _representante(self, chaves: np.ndarray) -> np.ndarray:
+        """ Ponto do balde (gama^(k-1), gama^k] com o mesmo erro relativo para as duas pontas. """
+        return 2 * self._gama ** chaves.astype(float) / (self._gama + 1)
+
+
+def _esboco_do_pedaco(valores: np.ndarray, inicio: int, fim: int, erro_relativo: float,
+                      max_baldes: int) -> EsbocoQuantis:
+    esboco = EsbocoQuantis(erro_relativo, max_baldes)
+    esboco.adicionar_varios(valores[inicio:fim])
+    return esboco
+
+
+def esboco_de_serie(valores: np.ndarray, erro_relativo: float = 0.01, max_baldes: int = 2048,
+                    tamanho_pedaco: int = 1_000_000, n_processos: int | None = 1) -> EsbocoQuantis:
+    """ Esboço de um histórico longo, montado em pedaços de `tamanho_pedaco` valores (em paralelo com
+    `n_processos` diferente de 1) e depois juntado. """
+    valores = np.asarray(valores, dtype=float).ravel()
+    pedacos = [(inicio, min(inicio + tamanho_pedaco, len(valores))) for inicio in range(0, len(valores),
+                                                                                     tamanho_pedaco)]
+    montar = partial(_esboco_do_pedaco, erro_relativo=erro_relativo, max_baldes=max_baldes)
+    esboco = EsbocoQuantis(erro_relativo, max_baldes)
+    for pedaco in mapear(montar, pedacos, valores, n_processos=n_processos):
+        esboco.juntar(pedaco)
+    return esboco
+
+
+class NormalizadorIncremental:
+    """ Versão em fluxo de `normalizar`: cada valor recebido entra no esboço, e a saída usa os quantis de todo o
+    histórico até ele, com memória constante. Um esboço já montado (por exemplo com `esboco_de_serie`) pode ser
+    passado como ponto de partida. """
+
+    def __init__(self, erro_relativo: float = 0.01, esboco: EsbocoQuantis | None = None):
+        self.esboco = esboco if esboco is not None else EsbocoQuantis(erro_relativo)
+
+    def atualizar(self, valor: float) -> float:
+        self.esboco.adicionar(valor)
+        f25, f50, f75 = self.esboco.quantis((0.25, 0.5, 0.75))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(100 * scipy.stats.norm.cdf(0.5 * (valor - f50) / (f75 - f25)) - 50)
+
+
+class ReescaladorIncremental:
+    """ Versão em fluxo de `reescalar`, com os quantis de todo o histórico até cada valor. """
+
+    def __init__(self, erro_relativo: float = 0.01, esboco: EsbocoQuantis | None = None):
+        self.esboco = esboco if esboco is not None else EsbocoQuantis(erro_relativo)
+
+    def atualizar(self, valor: float) -> float:
+        self.esboco.adicionar(valor)
+        f25, f75 = self.esboco.quantis((0.25, 0.75))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(100 * scipy.stats.norm.cdf(0.25 * valor / (f75 - f25)) - 50)
@@ -1,7 +1,23 @@
+from bisect import bisect_left, insort
+import numpy as np
 import pandas as pd
 import scipy
 
 
+def para_pandas(dados: pd.Series | pd.DataFrame | np.ndarray,
+                modelo: pd.Series | pd.DataFrame | None = None) -> pd.Series | pd.DataFrame:
+    """ Converte um array em Series (1D) ou DataFrame (2D, tempo x ativos). Com `modelo`, usa o índice, as
+    colunas e o nome dele; sem `modelo`, objetos do pandas passam direto. """
+    if modelo is None and isinstance(dados, (pd.Series, pd.DataFrame)):
+        return dados
+    valores = np.asarray(dados)
+    index = None if modelo is None else modelo.index
+    if valores.ndim == 1:
+        return pd.Series(valores, index=index, name=getattr(modelo, 'name', None))
+    colunas = modelo.columns if isinstance(modelo, pd.DataFrame) else None
+    return pd.DataFrame(valores, index=index, columns=colunas)
+
+
 def centralizar(serie: pd.Series, numero: int) -> pd.Series:
     """ Subtrai a mediana móvel de n períodos da série para centralizá-la.
         Como analogia, insere uma espécie de força gravitacional em torno do número 0,
@@ -12,16 +28,97 @@ def centralizar(serie: pd.Series, numero: int) -> pd.Series:
     return serie - serie.rolling(numero).median()
 
 
-def reescalar(serie: pd.Series) -> pd.Series:
+def reescalar(serie: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+    """ Com um DataFrame, cada coluna é reescalada pelos próprios quantis. """
+    serie = para_pandas(serie)
     f25 = serie.quantile(0.25)
     f75 = serie.quantile(0.75)
     serie_reescalada = 100 * scipy.stats.norm.cdf(0.25 * serie/(f75-f25)) - 50
-    return pd.Series(serie_reescalada, index=serie.index)
+    return para_pandas(serie_reescalada, modelo=serie)
 
 
-def normalizar(serie: pd.Series) -> pd.Series:
+def normalizar(serie: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+    """ Com um DataFrame, cada coluna é normalizada pelos próprios quantis. """
+    serie = para_pandas(serie)
     f25 = serie.quantile(0.25)
     f50 = serie.quantile(0.5)
     f75 = serie.quantile(0.75)
     serie_normalizada = 100 * scipy.stats.norm.cdf(0.5 * (serie - f50) / (f75 - f25)) - 50
-    return pd.Series(serie_normalizada, index=serie.index)
+    return para_pandas(serie_normalizada, modelo=serie)
+
+
+def _estatisticas_de_ordem_moveis(valores: np.ndarray, janela: int, quantis: tuple[float, ...],
+                                  mediana: bool = False) -> np.ndarray:
+    """ Quantis (interpolação linear, como no pandas) de cada janela, numa única passada: a janela é mantida
+    ordenada e cada passo insere e remove um valor por busca binária. Janelas com nulos ficam nulas.
+    Com `mediana`, devolve só a mediana, calculada como no `rolling().median()` do pandas. """
+    if janela <= 0:
+        raise ValueError('Janela não pode ser menor ou igual a zero.')
+    valores = np.asarray(valores, dtype=float).tolist()
+    posicoes = [quantil * (janela - 1) for quantil in quantis]
+    posicoes = [(int(posicao), posicao - int(posicao)) for posicao in posicoes]
+    meio = janela // 2
+    saida = np.full((len(valores), 1 if mediana else len(quantis)), np.nan)
+
+    ordenada = []
+    nulos = 0
+    for i, valor in enumerate(valores):
+        if valor != valor:
+            nulos += 1
+        else:
+            insort(ordenada, valor)
+        if i >= janela:
+            saindo = valores[i - janela]
+            if saindo != saindo:
+                nulos -= 1
+            else:
+                del ordenada[bisect_left(ordenada, saindo)]
+        if i < janela - 1 or nulos:
+            continue
+        if mediana:
+            saida[i, 0] = ordenada[meio] if janela % 2 else (ordenada[meio] + ordenada[meio - 1]) / 2
+            continue
+        for coluna, (inferior, fracao) in enumerate(posicoes):
+            baixo = ordenada[inferior]
+            saida[i, coluna] = baixo + (ordenada[inferior + 1] - baixo) * fracao if fracao else baixo
+    return saida
+
+
+def _por_coluna(serie: pd.Series | pd.DataFrame, calcular) -> list[pd.Series | pd.DataFrame]:
+    """ Aplica `calcular` (array 1D -> matriz tempo x resultados) a cada coluna e devolve um objeto do formato de
+    `serie` por resultado. """
+    serie = para_pandas(serie)
+    if isinstance(serie, pd.Series):
+        resultados = calcular(serie.to_numpy(dtype=float))
+        return [para_pandas(resultados[:, k], modelo=serie) for k in range(resultados.shape[1])]
+    colunas = [calcular(serie[coluna].to_numpy(dtype=float)) for coluna in serie.columns]
+    return [para_pandas(np.column_stack([resultado[:, k] for resultado in colunas]), modelo=serie)
+            for k in range(colunas[0].shape[1])] if colunas else []
+
+
+def mediana_movel(serie: pd.Series | pd.DataFrame, janela: int) -> pd.Series | pd.DataFrame:
+    """ Mediana das últimas `janela` observações, igual ao `rolling(janela).median()`. """
+    return _por_coluna(serie, lambda valores: _estatisticas_de_ordem_moveis(valores, janela, (), mediana=True))[0]
+
+
+def quantis_moveis(serie: pd.Series | pd.DataFrame, janela: int,
+                   quantis: tuple[float, ...] = (0.25, 0.5, 0.75)) -> list[pd.Series | pd.DataFrame]:
+    """ Quantis das últimas `janela` observações, todos calculados na mesma passada; um objeto por quantil, no
+    formato de `serie`. Iguais ao `rolling(janela).quantile(q)`. """
+    return _por_coluna(serie, lambda valores: _estatisticas_de_ordem_moveis(valores, janela, tuple(quantis)))
+
+
+def reescalar_movel(serie: pd.Series | pd.DataFrame, janela: int) -> pd.Series | pd.DataFrame:
+    """ Como `reescalar`, mas com os quantis das últimas `janela` observações, sem olhar o futuro. """
+    f25, f75 = quantis_moveis(serie, janela, (0.25, 0.75))
+    serie = para_pandas(serie)
+    serie_reescalada = 100 * scipy.stats.norm.cdf(0.25 * serie/(f75-f25)) - 50
+    return para_pandas(serie_reescalada, modelo=serie).where(f25.notna())
+
+
+def normalizar_movel(serie: pd.Series | pd.DataFrame, janela: int) -> pd.Series | pd.DataFrame:
+    """ Como `normalizar`, mas com os quantis das últimas `janela` observações, sem olhar o futuro. """
+    f25, f50, f75 = quantis_moveis(serie, janela, (0.25, 0.5, 0.75))
+    serie = para_pandas(serie)
+    serie_normalizada = 100 * scipy.stats.norm.cdf(0.5 * (serie - f50) / (f75 - f25)) - 50
+    return para_pandas(serie_normalizada, modelo=serie).where(f25.notna())
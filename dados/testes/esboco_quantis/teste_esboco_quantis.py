@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dados.esboco_quantis import EsbocoQuantis, EsbocosIncompativeis, esboco_de_serie, NormalizadorIncremental, \
+    ReescaladorIncremental
+from dados.preprocessamento import normalizar, reescalar
+
+valores = np.random.default_rng(8).standard_t(df=3, size=20_000) * 0.02
+valores[::97] = 0.
+valores[5] = np.nan
+quantis = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def teste_quantis_dentro_do_erro_relativo():
+    esboco = EsbocoQuantis(erro_relativo=0.01)
+    for valor in valores:
+        esboco.adicionar(valor)
+    exatos = np.quantile(valores[~np.isnan(valores)], quantis, method='lower')
+    assert len(esboco) == len(valores) - 1
+    np.testing.assert_array_less(np.abs(esboco.quantis(quantis) - exatos), 0.01 * np.abs(exatos) + 1e-15)
+
+
+def teste_adicionar_varios_igual_a_um_por_um():
+    um_por_um, de_uma_vez = EsbocoQuantis(), EsbocoQuantis()
+    for valor in valores[:3000]:
+        um_por_um.adicionar(valor)
+    de_uma_vez.adicionar_varios(valores[:3000])
+    np.testing.assert_array_equal(um_por_um.quantis(quantis), de_uma_vez.quantis(quantis))
+
+
+def teste_juntar_pedacos_igual_a_esboco_unico():
+    unico = EsbocoQuantis()
+    unico.adicionar_varios(valores)
+    juntado = EsbocoQuantis()
+    for pedaco in np.array_split(valores, 7):
+        parcial = EsbocoQuantis()
+        parcial.adicionar_varios(pedaco)
+        juntado.juntar(parcial)
+    assert len(juntado) == len(unico)
+    np.testing.assert_array_equal(juntado.quantis(quantis), unico.quantis(quantis))
+
+    paralelo = esboco_de_serie(valores, tamanho_pedaco=3000, n_processos=2)
+    np.testing.assert_array_equal(paralelo.quantis(quantis), unico.quantis(quantis))
+
+    with pytest.raises(EsbocosIncompativeis):
+        juntado.juntar(EsbocoQuantis(erro_relativo=0.05))
+
+
+def teste_memoria_limitada():
+    esboco = EsbocoQuantis(max_baldes=64)
+    esboco.adicionar_varios(np.geomspace(1e-9, 1e9, 10_000))
+    assert len(esboco._positivos.contagens) == 64
+    # Os quantis altos não perdem precisão com o colapso dos baldes pequenos.
+    assert abs(esboco.quantil(0.99) / np.quantile(np.geomspace(1e-9, 1e9, 10_000), 0.99, method='lower') - 1) < 0.01
+
+
+def teste_esboco_vazio():
+    assert np.isnan(EsbocoQuantis().quantil(0.5))
+
+
+def teste_normalizacao_em_fluxo():
+    serie = pd.Series(valores[:2000]).dropna()
+    normalizador, reescalador = NormalizadorIncremental(), ReescaladorIncremental()
+    normalizados = [normalizador.atualizar(valor) for valor in serie]
+    reescalados = [reescalador.atualizar(valor) for valor in serie]
+    # Ao final, o histórico visto é a série inteira.
+    assert abs(normalizados[-1] - normalizar(serie).iloc[-1]) < 1
+    assert abs(reescalados[-1] - reescalar(serie).iloc[-1]) < 1
+    # Sem olhar para a frente: o valor em t só depende do histórico até t.
+    parcial = NormalizadorIncremental()
+    np.testing.assert_array_equal([parcial.atualizar(valor) for valor in serie.iloc[:500]], normalizados[:500])
+
+
+def teste_normalizador_parte_de_esboco_pronto():
+    historico = esboco_de_serie(valores[:10_000], tamanho_pedaco=2500)
+    normalizador = NormalizadorIncremental(esboco=historico)
+    continuo = NormalizadorIncremental()
+    for valor in valores[:10_000]:
+        continuo.atualizar(valor)
+    assert normalizador.atualizar(valores[10_000]) == continuo.atualizar(valores[10_000])
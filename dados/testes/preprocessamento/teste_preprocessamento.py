@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import scipy
+from dados.preprocessamento import mediana_movel, quantis_moveis, normalizar_movel, reescalar_movel
+
+dias = pd.date_range('2021-01-01', periods=300, freq='D')
+serie = pd.Series(np.random.default_rng(6).normal(size=len(dias)), index=dias)
+serie.iloc[[4, 90, 91]] = np.nan
+serie.iloc[150:170] = 1.
+
+
+def teste_mediana_e_quantis_iguais_ao_pandas():
+    for janela in (1, 4, 25):
+        np.testing.assert_array_equal(mediana_movel(serie, janela).values, serie.rolling(janela).median().values)
+        for quantil, resultado in zip((0.1, 0.25, 0.75), quantis_moveis(serie, janela, (0.1, 0.25, 0.75))):
+            np.testing.assert_array_equal(resultado.values, serie.rolling(janela).quantile(quantil).values)
+
+
+def teste_quantis_moveis_painel():
+    painel = pd.DataFrame({'A': serie, 'B': serie * 2})
+    f25, f75 = quantis_moveis(painel, 10, (0.25, 0.75))
+    pd.testing.assert_frame_equal(f75, painel.rolling(10).quantile(0.75))
+
+
+def teste_normalizar_movel():
+    normalizada = normalizar_movel(serie, 30)
+    f25, f50, f75 = (serie.rolling(30).quantile(q) for q in (0.25, 0.5, 0.75))
+    esperada = 100 * scipy.stats.norm.cdf(0.5 * (serie - f50) / (f75 - f25)) - 50
+    np.testing.assert_allclose(normalizada.values, np.where(f25.notna(), esperada, np.nan))
+
+
+def teste_reescalar_movel_nao_olha_o_futuro():
+    alterada = serie.copy()
+    alterada.iloc[200:] *= 10
+    pd.testing.assert_series_equal(reescalar_movel(serie, 30).iloc[:200], reescalar_movel(alterada, 30).iloc[:200])
@@ -4,6 +4,8 @@ from fundo_quant.operacional import Ativo
 from fundo_quant.estrategia import GoldenCrossLongOnly
 from fundo_quant.executores import ExecutorLongOnly
 from fundo_quant.backtest import WalkForward
+from fundo_quant.grade import avaliar_grade_golden_cross
+from calculadora.paralelo import mapear
 from dataclasses import dataclass
 import pandas as pd
 
@@ -25,30 +27,47 @@ def gerar_parametros_a_testar(limites_curta: tuple[int, int], limites_longa: tup
     return combinacoes
 
 
-def obter_parametros_otimos(moeda: Moeda):
+def avaliar_parametros(fechamento: pd.Series, janela_curta: int, janela_longa: int) -> GoldenCrossResults:
+    # Configurando ativo
+    bitcoin = Ativo(saldo_inicial=10_000)
+    media_curta = MediaMovel.exponencial(fechamento, window=janela_curta)
+    media_longa = MediaMovel.exponencial(fechamento, window=janela_longa)
+    estrategia = GoldenCrossLongOnly(bitcoin, media_curta=media_curta, media_longa=media_longa)
+
+    # Configurando executor
+    ex = ExecutorLongOnly(bitcoin)
+
+    # Rodando BackTest
+    backtest = WalkForward(estrategia=estrategia, ex=ex, precos=fechamento, atraso=1)
+    retorno = backtest.obter_serie_retorno_teste()
+    return GoldenCrossResults(retornos=retorno,
+                              janela_curta=janela_curta,
+                              janela_longa=janela_longa)
+
+
+def obter_parametros_otimos(moeda: Moeda, n_processos: int | None = None):
+    """ Testa cada combinação de janelas em paralelo. Com `n_processos=None` usa todos os núcleos e com
+    `n_processos=1` roda em série. Os resultados seguem a ordem de `gerar_parametros_a_testar`. """
+
+    # Coletando Dados
+    dados = Api(moeda).obter()
+
+    parametros = gerar_parametros_a_testar((10, 30), (30, 120))
+
+    return mapear(avaliar_parametros, parametros, dados['Fechamento'], n_processos=n_processos)
+
+
+def obter_parametros_otimos_grade(moeda: Moeda):
+    """ Mesmo resultado de `obter_parametros_otimos`, avaliando todas as combinações numa única simulação. """
 
     # Coletando Dados
     dados = Api(moeda).obter()
 
     parametros = gerar_parametros_a_testar((10, 30), (30, 120))
 
-    # Configurando estratégia
-    resultados = []
-    for janela_curta, janela_longa in parametros:
-        # Configurando ativo
-        bitcoin = Ativo(saldo_inicial=10_000)
-        media_curta = MediaMovel.exponencial(dados['Fechamento'], window=janela_curta)
-        media_longa = MediaMovel.exponencial(dados['Fechamento'], window=janela_longa)
-        estrategia = GoldenCrossLongOnly(bitcoin, media_curta=media_curta, media_longa=media_longa)
-
-        # Configurando executor
-        ex = ExecutorLongOnly(bitcoin)
-
-        # Rodando BackTest
-        backtest = WalkForward(estrategia=estrategia, ex=ex, precos=dados['Fechamento'], atraso=1)
-        retorno = backtest.obter_serie_retorno_teste()
-        resultados.append(GoldenCrossResults(retornos=retorno,
-                                             janela_curta=janela_curta,
-                                             janela_longa=janela_longa))
-
-    return resultados
+    grade = avaliar_grade_golden_cross(dados['Fechamento'], parametros, saldo_inicial=10_000, atraso=1,
+                                       pct_treino=0.8)
+    return [GoldenCrossResults(retornos=grade.obter_retorno(janela_curta, janela_longa),
+                               janela_curta=janela_curta,
+                               janela_longa=janela_longa)
+            for janela_curta, janela_longa in parametros]
@@ -1,6 +1,12 @@
+from collections import deque
+from math import floor
+from typing import Iterable, Iterator
+import numpy as np
 import pandas as pd
-from fundo_quant.estrategia import Estrategia
+from fundo_quant.estrategia import Estrategia, EstrategiaIncremental
 from fundo_quant.executores import ExecutorLongOnly
+from fundo_quant.operacional import Ordem
+from fundo_quant.stops import primeira_passagem
 
 
 class WalkForward:
@@ -15,25 +21,237 @@ class WalkForward:
         self.precos = precos.sort_index().shift(atraso)
         self.pct_treino = pct_treino
 
-    def obter_serie(self):
-        dia = 0
+    def _obter_ordem(self, sinais: np.ndarray | None, dia: int) -> Ordem | None:
+        """ Usa os sinais calculados de uma vez quando a estratégia os oferece; senão, pergunta dia a dia. """
+        if sinais is None:
+            return self.estrategia.obter_ordem()
+        posicao = self.ex.ativo.obter_posicao()
+        if sinais[dia] == 1 and posicao == 0:
+            return Ordem.COMPRAR
+        if sinais[dia] == -1 and posicao > 0:
+            return Ordem.VENDER
+
+    def _obter_serie(self, precos: pd.Series) -> pd.Series:
+        sinais = self.estrategia.obter_sinais()
+        if sinais is not None:
+            sinais = _alinhar_sinais(np.asarray(sinais), len(precos))
         pls = []
-        for horario in self.precos.index.to_list():
-            preco = self.precos.loc[horario]
-            self.ex.executar_ordem(ordem=self.estrategia.obter_ordem(), preco=preco, horario=horario)
+        for dia, (horario, preco) in enumerate(zip(precos.index.to_list(), precos.to_list())):
+            self.ex.executar_ordem(ordem=self._obter_ordem(sinais, dia), preco=preco, horario=horario)
             self.estrategia.setar_dia(dia)
             pls.append(self.ex.ativo.lucro_acumulado_pct(preco_atual=preco))
-            dia += 1
-        return pd.Series(pls, index=self.precos.index.to_list())
+        return pd.Series(pls, index=precos.index.to_list())
+
+    def obter_serie(self):
+        return self._obter_serie(self.precos)
 
     def obter_serie_retorno_teste(self):
-        dia = 0
-        pls = []
-        horarios_teste = self.precos.index.to_list()[int(len(self.precos) * self.pct_treino):]
-        for horario in horarios_teste:
-            preco = self.precos.loc[horario]
-            self.ex.executar_ordem(ordem=self.estrategia.obter_ordem(), preco=preco, horario=horario)
-            self.estrategia.setar_dia(dia)
-            pls.append(self.ex.ativo.lucro_acumulado_pct(preco_atual=preco))
-            dia += 1
-        return pd.Series(pls, index=horarios_teste)
+        return self._obter_serie(self.precos.iloc[int(len(self.precos) * self.pct_treino):])
+
+
+def _alinhar_sinais(sinais: np.ndarray, n_barras: int) -> np.ndarray:
+    """ Sinal executado em cada barra. O WalkForward só avança o dia da estratégia depois de executar a ordem,
+    então a barra i usa o sinal do dia i - 1 (e a primeira barra usa o do dia 0). """
+    return sinais[np.maximum(np.arange(n_barras) - 1, 0)]
+
+
+def _simular_long_only(precos: np.ndarray, sinais: np.ndarray, saldo_inicial: float,
+                       stop_loss: float | None = None,
+                       stop_gain: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """ Reproduz o ExecutorLongOnly a partir de arrays: compra a quantidade inteira máxima na primeira barra com
+    sinal 1 em que o preço caiba no saldo e zera a posição na primeira barra seguinte com sinal -1 ou no primeiro
+    stop acionado antes dela. A estratégia emite a ordem antes de o stop zerar a posição, então a recompra só
+    pode acontecer a partir da barra seguinte ao stop.
+
+    Retorna o saldo e a posição ao final de cada barra. O laço é sobre operações, não sobre barras. Uma ordem de
+    compra numa barra com preço nulo levanta ValueError, como no executor. """
+    n = len(precos)
+    barras_compra = np.flatnonzero(sinais == 1)
+    barras_venda = np.flatnonzero(sinais == -1)
+
+    variacao_saldo = np.zeros(n)
+    variacao_posicao = np.zeros(n)
+    saldo = saldo_inicial
+    inicio = 0
+    while True:
+        candidatas = barras_compra[np.searchsorted(barras_compra, inicio):]
+        if len(candidatas) == 0:
+            break
+        if precos[candidatas[0]] <= saldo:
+            entrada = candidatas[0]
+        else:
+            # Preço acima do saldo: o executor compra zero e tenta de novo na próxima barra.
+            cabem = np.flatnonzero(precos[candidatas] <= saldo)
+            tentativas = candidatas[:cabem[0]] if len(cabem) else candidatas
+            # Com preço nulo (como nas primeiras barras atrasadas), o executor falha ao calcular a quantidade.
+            if np.isnan(precos[tentativas]).any():
+                raise ValueError('Ordem de compra numa barra com preço nulo.')
+            if len(cabem) == 0:
+                break
+            entrada = candidatas[cabem[0]]
+        quantidade = floor(saldo / precos[entrada])
+        saldo -= precos[entrada] * quantidade
+        variacao_saldo[entrada] -= precos[entrada] * quantidade
+        variacao_posicao[entrada] += quantidade
+
+        vendas = barras_venda[np.searchsorted(barras_venda, entrada, side='right'):]
+        saida = vendas[0] if len(vendas) else n
+        inicio = saida + 1
+        if stop_loss is not None or stop_gain is not None:
+            stop = primeira_passagem(precos, [entrada], [saida], stop_loss=stop_loss, stop_gain=stop_gain)[0]
+            if stop < saida:
+                saida, inicio = stop, stop + 1
+        if saida == n:
+            break
+        saldo += precos[saida] * quantidade
+        variacao_saldo[saida] += precos[saida] * quantidade
+        variacao_posicao[saida] -= quantidade
+
+    return saldo_inicial + np.cumsum(variacao_saldo), np.cumsum(variacao_posicao)
+
+
+def _lucro_acumulado_pct(saldos: np.ndarray, posicoes: np.ndarray, precos: np.ndarray,
+                         saldo_inicial: float) -> np.ndarray:
+    """ Equivalente vetorizado de Ativo.lucro_acumulado_pct. """
+    patrimonio = saldos + np.where(posicoes != 0, posicoes * precos, 0)
+    return np.round(patrimonio / saldo_inicial - 1, 10)
+
+
+class WalkForwardVetorizado:
+    """ Mesmo resultado do WalkForward com ExecutorLongOnly, calculado com operações NumPy.
+
+    `sinais` tem um valor por dia da estratégia (1 compra, -1 venda, 0 nada), como em `sinais_cruzamento`.
+    `stop_loss` e `stop_gain` têm o mesmo significado que no ExecutorLongOnly. """
+
+    def __init__(self, sinais: np.ndarray | pd.Series,
+                 precos: pd.Series,
+                 saldo_inicial: float,
+                 atraso: int = 1,
+                 pct_treino: float = 0.8,
+                 stop_loss: float | None = None,
+                 stop_gain: float | None = None):
+        self.sinais = np.asarray(sinais)
+        self.precos = precos.sort_index().shift(atraso)
+        self.saldo_inicial = saldo_inicial
+        self.pct_treino = pct_treino
+        self.stop_loss = stop_loss
+        self.stop_gain = stop_gain
+
+    @classmethod
+    def de_estrategia(cls, estrategia: Estrategia, precos: pd.Series, saldo_inicial: float,
+                      **kwargs) -> 'WalkForwardVetorizado':
+        """ Cria o backtest a partir dos sinais da estratégia; ela precisa implementar `obter_sinais`. """
+        sinais = estrategia.obter_sinais()
+        if sinais is None:
+            raise ValueError(f'{type(estrategia).__name__} não calcula os sinais de uma vez; use o WalkForward.')
+        return cls(sinais=sinais, precos=precos, saldo_inicial=saldo_inicial, **kwargs)
+
+    def _obter_serie(self, precos: pd.Series) -> pd.Series:
+        valores = precos.to_numpy(dtype=float)
+        sinais = _alinhar_sinais(self.sinais, len(valores))
+        saldos, posicoes = _simular_long_only(valores, sinais, self.saldo_inicial,
+                                              stop_loss=self.stop_loss, stop_gain=self.stop_gain)
+        pls = _lucro_acumulado_pct(saldos, posicoes, valores, self.saldo_inicial)
+        return pd.Series(pls, index=precos.index.to_list())
+
+    def obter_serie(self) -> pd.Series:
+        return self._obter_serie(self.precos)
+
+    def obter_serie_retorno_teste(self) -> pd.Series:
+        # Assim como no WalkForward, os dias da estratégia recomeçam em zero no início do período de teste.
+        return self._obter_serie(self.precos.iloc[int(len(self.precos) * self.pct_treino):])
+
+
+def _extrair_preco(barra: tuple | dict) -> tuple:
+    """ Aceita (horario, preco), barras OHLCV (horario, abertura, maxima, minima, fechamento[, volume]) ou
+    dicionários com as chaves 'Data' e 'Fechamento'. """
+    if isinstance(barra, dict):
+        return barra['Data'], barra['Fechamento']
+    if len(barra) == 2:
+        return barra[0], barra[1]
+    return barra[0], barra[4]
+
+
+class WalkForwardEmFluxo:
+    """ WalkForward que consome as barras de um iterador, em ordem cronológica, sem guardar o histórico.
+
+    A memória usada é a das últimas `atraso` barras mais o estado da estratégia e do ativo. A estratégia recebe
+    cada preço depois de a ordem da barra ser executada, como no WalkForward. """
+
+    def __init__(self, estrategia: EstrategiaIncremental,
+                 ex: ExecutorLongOnly,
+                 atraso: int = 1):
+        self.estrategia = estrategia
+        self.ex = ex
+        self.atraso = atraso
+
+    def iterar(self, barras: Iterable[tuple | dict]) -> Iterator[tuple]:
+        """ Gera (horario, lucro acumulado percentual) a cada barra. """
+        precos_recentes = deque(maxlen=self.atraso + 1)
+        for barra in barras:
+            horario, preco_barra = _extrair_preco(barra)
+            precos_recentes.append(preco_barra)
+            preco = precos_recentes[0] if len(precos_recentes) > self.atraso else np.nan
+            if preco == preco:
+                self.ex.executar_ordem(ordem=self.estrategia.obter_ordem(), preco=preco, horario=horario)
+            self.estrategia.atualizar(preco_barra)
+            yield horario, self.ex.ativo.lucro_acumulado_pct(preco_atual=preco)
+
+    def obter_resultado(self, barras: Iterable[tuple | dict]) -> float:
+        """ Lucro acumulado percentual ao final das barras. """
+        pl = 0.0
+        for _, pl in self.iterar(barras):
+            pass
+        return pl
+
+
+class WalkForwardCarteira:
+    """ Backtest long-only de vários ativos ao mesmo tempo, com um único saldo compartilhado.
+
+    `precos` e `sinais` são tempo x ativos; os sinais seguem a convenção de `sinais_cruzamento` e podem ser
+    calculados de uma vez para todas as colunas. Cada compra usa a quantidade inteira máxima cabível em
+    min(saldo / ativos comprados na barra, patrimônio / número de ativos). O laço percorre as barras e cada passo
+    opera sobre vetores com uma entrada por ativo. """
+
+    def __init__(self, sinais: pd.DataFrame | np.ndarray,
+                 precos: pd.DataFrame,
+                 saldo_inicial: float,
+                 atraso: int = 1):
+        self.sinais = np.asarray(sinais)
+        self.precos = precos.sort_index().shift(atraso)
+        self.saldo_inicial = saldo_inicial
+        self.posicoes: pd.DataFrame | None = None
+
+    def obter_serie(self) -> pd.Series:
+        precos = self.precos.to_numpy(dtype=float)
+        n_barras, n_ativos = precos.shape
+        sinais = _alinhar_sinais(self.sinais, n_barras)
+
+        saldo = float(self.saldo_inicial)
+        posicao = np.zeros(n_ativos)
+        ultimo_preco = np.zeros(n_ativos)
+        posicoes = np.empty((n_barras, n_ativos))
+        patrimonios = np.empty(n_barras)
+        for i in range(n_barras):
+            preco = precos[i]
+            valido = preco == preco
+            ultimo_preco[valido] = preco[valido]
+
+            vender = valido & (sinais[i] == -1) & (posicao > 0)
+            if vender.any():
+                saldo += preco[vender] @ posicao[vender]
+                posicao[vender] = 0
+
+            comprar = valido & (sinais[i] == 1) & (posicao == 0)
+            if comprar.any():
+                patrimonio = saldo + posicao @ ultimo_preco
+                alocacao = min(saldo / comprar.sum(), patrimonio / n_ativos)
+                quantidade = np.floor(alocacao / preco[comprar])
+                saldo -= preco[comprar] @ quantidade
+                posicao[comprar] = quantidade
+
+            posicoes[i] = posicao
+            patrimonios[i] = saldo + posicao @ ultimo_preco
+
+        self.posicoes = pd.DataFrame(posicoes, index=self.precos.index, columns=self.precos.columns)
+        return pd.Series(np.round(patrimonios / self.saldo_inicial - 1, 10), index=self.precos.index)
@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
+from calculadora.indicadores.incrementais import MediaExponencialIncremental
 from fundo_quant.operacional import Ativo, Ordem
 
 
+def sinais_cruzamento(media_curta: pd.Series, media_longa: pd.Series) -> np.ndarray:
+    """ Sinal de cada dia do cruzamento de médias: 1 (curta acima), -1 (curta abaixo) ou 0. """
+    diferenca = np.asarray(media_curta, dtype=float) - np.asarray(media_longa, dtype=float)
+    return np.nan_to_num(np.sign(diferenca)).astype(np.int8)
+
+
 class Estrategia(ABC):
 
     @abstractmethod
@@ -13,6 +21,11 @@ class Estrategia(ABC):
     def setar_dia(self, i):
         pass
 
+    def obter_sinais(self) -> np.ndarray | None:
+        """ Sinais de todos os dias de uma vez: 1 compra se a posição estiver zerada, -1 vende se estiver comprada
+        e 0 não faz nada. Estratégias que só funcionam dia a dia retornam None. """
+        return None
+
 
 class GoldenCrossLongOnly(Estrategia):
 
@@ -43,3 +56,49 @@ class GoldenCrossLongOnly(Estrategia):
 
     def setar_dia(self, i):
         self._dia_atual = i
+
+    def obter_sinais(self) -> np.ndarray:
+        return sinais_cruzamento(self.media_curta, self.media_longa)
+
+
+class EstrategiaIncremental(ABC):
+    """ Estratégia alimentada um preço por vez, para backtests que não têm a série inteira em memória. """
+
+    @abstractmethod
+    def obter_ordem(self) -> Ordem:
+        pass
+
+    @abstractmethod
+    def atualizar(self, preco: float):
+        pass
+
+
+class GoldenCrossLongOnlyIncremental(EstrategiaIncremental):
+    """ GoldenCrossLongOnly com as médias exponenciais atualizadas a cada preço recebido, iguais às de
+    `MediaMovel.exponencial` (inclusive com preços nulos no meio). """
+
+    def __init__(self, ativo: Ativo,
+                 janela_curta: int,
+                 janela_longa: int):
+        self.ativo = ativo
+        self._media_curta = MediaExponencialIncremental(janela_curta)
+        self._media_longa = MediaExponencialIncremental(janela_longa)
+
+    @property
+    def media_curta(self) -> float:
+        return self._media_curta.valor
+
+    @property
+    def media_longa(self) -> float:
+        return self._media_longa.valor
+
+    def atualizar(self, preco: float):
+        self._media_curta.atualizar(preco)
+        self._media_longa.atualizar(preco)
+
+    def obter_ordem(self) -> Ordem:
+        # Antes do primeiro preço as médias são nulas e nenhuma comparação passa.
+        if self.media_curta > self.media_longa and self.ativo.obter_posicao() == 0:
+            return Ordem.COMPRAR
+        if self.media_curta < self.media_longa and self.ativo.obter_posicao() > 0:
+            return Ordem.VENDER
@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+import datetime
+import pandas as pd
+
+
+class TipoEvento(Enum):
+    COMPRA = 'compra'
+    VENDA = 'venda'
+    STOP_LOSS = 'stop_loss'
+    STOP_GAIN = 'stop_gain'
+
+
+class Registrador(ABC):
+    """ Destino dos eventos de execução. Recebe os campos soltos para não criar um objeto por operação. """
+
+    @abstractmethod
+    def registrar(self, tipo: TipoEvento, preco: float, quantidade: int | float, horario: datetime.datetime):
+        pass
+
+    def fechar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+class RegistradorNulo(Registrador):
+    """ Descarta os eventos. Padrão do ExecutorLongOnly. """
+
+    def registrar(self, tipo: TipoEvento, preco: float, quantidade: int | float, horario: datetime.datetime):
+        pass
+
+
+class RegistradorMemoria(Registrador):
+    """ Guarda os eventos em memória para auditoria depois do backtest. """
+
+    def __init__(self):
+        self.eventos: list[tuple] = []
+
+    def registrar(self, tipo: TipoEvento, preco: float, quantidade: int | float, horario: datetime.datetime):
+        self.eventos.append((tipo, preco, quantidade, horario))
+
+    def para_dataframe(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.eventos, columns=['Tipo', 'Preco', 'Quantidade', 'Horario'])
+        df['Tipo'] = df['Tipo'].map(lambda tipo: tipo.value)
+        return df
+
+
+class RegistradorArquivo(Registrador):
+    """ Escreve os eventos em CSV, em lotes de `tamanho_lote` linhas. Chame `fechar` (ou use `with`) ao final
+    para gravar o último lote. """
+
+    def __init__(self, caminho: str, tamanho_lote: int = 10_000):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self._lote: list[str] = []
+        with open(self.caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write('tipo,preco,quantidade,horario\n')
+
+    def registrar(self, tipo: TipoEvento, preco: float, quantidade: int | float, horario: datetime.datetime):
+        self._lote.append(f'{tipo.value},{preco},{quantidade},{horario}\n')
+        if len(self._lote) >= self.tamanho_lote:
+            self._gravar()
+
+    def _gravar(self):
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.writelines(self._lote)
+        self._lote = []
+
+    def fechar(self):
+        if self._lote:
+            self._gravar()
+
+
+class RegistradorTela(Registrador):
+    """ Imprime cada evento, como o ExecutorLongOnly fazia originalmente. """
+
+    def registrar(self, tipo: TipoEvento, preco: float, quantidade: int | float, horario: datetime.datetime):
+        if tipo == TipoEvento.COMPRA:
+            print(f"Comprando {quantidade} ao preco R${round(preco, 2)}.")
+        elif tipo == TipoEvento.VENDA:
+            print(f"Fechando posicao a R${round(preco, 2)}.")
+        elif tipo == TipoEvento.STOP_LOSS:
+            print(f"Stopando a perda no preco R${round(preco, 2)}.")
+        else:
+            print(f"Stopando o ganho no preco R${round(preco, 2)}.")
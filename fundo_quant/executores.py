@@ -1,4 +1,5 @@
 from fundo_quant.operacional import Ativo, Ordem
+from fundo_quant.eventos import Registrador, RegistradorNulo, TipoEvento
 from datetime import datetime
 from math import floor
 
@@ -7,31 +8,34 @@ class ExecutorLongOnly:
 
     def __init__(self, ativo: Ativo,
                  stop_loss: float | None = None,
-                 stop_gain: float | None = None):
+                 stop_gain: float | None = None,
+                 registrador: Registrador | None = None):
+        """ As execuções são enviadas ao `registrador`; por padrão são descartadas. """
         self.ativo = ativo
         self.stop_gain = stop_gain
         self.stop_loss = stop_loss
+        self.registrador = RegistradorNulo() if registrador is None else registrador
 
     def _stopar_loss(self, preco: float, horario: datetime):
         if self.ativo.obter_resultado_em_aberto_pct(preco_atual=preco) < -abs(self.stop_loss) \
                 and self.ativo.obter_posicao() != 0:
-            print(f"Stopando a perda no preco R${round(preco, 2)}.")
+            self.registrador.registrar(TipoEvento.STOP_LOSS, preco, self.ativo.obter_posicao(), horario)
             self.ativo.fechar_posicao(preco=preco, horario=horario)
 
     def _stopar_gain(self, preco: float, horario: datetime):
         if self.ativo.obter_resultado_em_aberto_pct(preco_atual=preco) > abs(self.stop_gain) \
                 and self.ativo.obter_posicao() != 0:
-            print(f"Stopando o ganho no preco R${round(preco, 2)}.")
+            self.registrador.registrar(TipoEvento.STOP_GAIN, preco, self.ativo.obter_posicao(), horario)
             self.ativo.fechar_posicao(preco=preco, horario=horario)
 
     def _comprar(self, preco: float, horario: datetime):
         """ Compra a quantidade inteira máxima possível. """
         quantidade = floor(self.ativo.saldo/preco)
-        print(f"Comprando {quantidade} ao preco R${round(preco, 2)}.")
+        self.registrador.registrar(TipoEvento.COMPRA, preco, quantidade, horario)
         self.ativo.comprar(preco=preco, quantidade=quantidade, horario=horario)
 
     def _vender(self, preco: float, horario: datetime):
-        print(f"Fechando posicao a R${round(preco, 2)}.")
+        self.registrador.registrar(TipoEvento.VENDA, preco, self.ativo.obter_posicao(), horario)
         self.ativo.fechar_posicao(preco=preco, horario=horario)
 
     def executar_ordem(self, ordem: Ordem | None, preco: float, horario: datetime):
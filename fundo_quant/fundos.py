@@ -3,6 +3,7 @@ from calculadora.indicadores.tendencia import MediaMovel
 from fundo_quant.operacional import Ativo
 from fundo_quant.estrategia import GoldenCrossLongOnly
 from fundo_quant.executores import ExecutorLongOnly
+from fundo_quant.eventos import RegistradorTela
 from fundo_quant.backtest import WalkForward
 import matplotlib.pyplot as plt
 
@@ -21,7 +22,7 @@ def fundo_cripto_v1(moeda: Moeda):
     estrategia = GoldenCrossLongOnly(ativo, media_curta=media_curta, media_longa=media_longa)
 
     # Configurando executor
-    ex = ExecutorLongOnly(ativo)
+    ex = ExecutorLongOnly(ativo, registrador=RegistradorTela())
 
     # Rodando BackTest
     retorno = WalkForward(estrategia=estrategia, ex=ex, precos=dados['Fechamento']).obter_serie()
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from functools import partial
+import numpy as np
+import pandas as pd
+from calculadora.indicadores.performance import tabela_de_desempenho
+from calculadora.indicadores.tendencia import banco_media_exponencial
+from calculadora.paralelo import mapear
+from fundo_quant.backtest import _alinhar_sinais, _lucro_acumulado_pct
+
+
+@dataclass()
+class ResultadoGrade:
+    parametros: list[tuple[int, int]]
+    # Tempo x combinações, com colunas (janela_curta, janela_longa).
+    retornos: pd.DataFrame
+    posicoes: np.ndarray
+
+    def obter_retorno(self, janela_curta: int, janela_longa: int) -> pd.Series:
+        return self.retornos[(janela_curta, janela_longa)]
+
+    def obter_desempenho(self, periodos_por_ano: int = 252, ordenar_por: str = 'sharpe') -> pd.DataFrame:
+        """ Tabela de `tabela_de_desempenho` com uma linha por combinação, da melhor para a pior. """
+        return tabela_de_desempenho(1 + self.retornos.dropna(), periodos_por_ano=periodos_por_ano,
+                                    ordenar_por=ordenar_por)
+
+
+def _sinais_grade(precos: pd.Series, parametros: list[tuple[int, int]]) -> np.ndarray:
+    """ Sinais de cruzamento (tempo x combinações) calculando cada média uma única vez. """
+    janelas = sorted({janela for combinacao in parametros for janela in combinacao})
+    medias = banco_media_exponencial(precos, janelas)
+    posicao_janela = {janela: i for i, janela in enumerate(janelas)}
+    curtas = [posicao_janela[curta] for curta, _ in parametros]
+    longas = [posicao_janela[longa] for _, longa in parametros]
+    return np.nan_to_num(np.sign(medias[:, curtas] - medias[:, longas])).astype(np.int8)
+
+
+def _simular_grade_long_only(precos: np.ndarray, sinais: np.ndarray,
+                             saldo_inicial: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Simula o ExecutorLongOnly sem stops para todas as colunas de `sinais` ao mesmo tempo.
+
+    O laço percorre as barras; cada passo opera sobre vetores com uma entrada por combinação. Também retorna quais
+    combinações deram ordem de compra numa barra com preço nulo, caso em que o executor levanta ValueError; o
+    saldo delas fica nulo daí em diante. """
+    n_barras, n_combinacoes = sinais.shape
+    saldos = np.empty((n_barras, n_combinacoes))
+    posicoes = np.empty((n_barras, n_combinacoes))
+    saldo = np.full(n_combinacoes, float(saldo_inicial))
+    posicao = np.zeros(n_combinacoes)
+    invalidas = np.zeros(n_combinacoes, dtype=bool)
+    for i in range(n_barras):
+        preco = precos[i]
+        vender = (sinais[i] == -1) & (posicao > 0)
+        if vender.any():
+            saldo[vender] += preco * posicao[vender]
+            posicao[vender] = 0
+        comprar = (sinais[i] == 1) & (posicao == 0)
+        if comprar.any():
+            if preco != preco:
+                invalidas |= comprar
+                saldo[comprar] = np.nan
+            else:
+                quantidade = np.floor(saldo[comprar] / preco)
+                saldo[comprar] -= preco * quantidade
+                posicao[comprar] = quantidade
+        saldos[i] = saldo
+        posicoes[i] = posicao
+    return saldos, posicoes, invalidas
+
+
+def avaliar_grade_golden_cross(precos: pd.Series,
+                               parametros: list[tuple[int, int]],
+                               saldo_inicial: float,
+                               atraso: int = 1,
+                               pct_treino: float | None = None) -> ResultadoGrade:
+    """ Retornos acumulados do GoldenCrossLongOnly para todas as combinações (janela curta, janela longa).
+
+    Equivale a rodar o WalkForward com ExecutorLongOnly para cada combinação; com `pct_treino`, equivale a
+    `obter_serie_retorno_teste`. Como no executor, uma ordem de compra numa barra com preço nulo (por exemplo
+    nas primeiras barras atrasadas) levanta ValueError. """
+    sinais = _sinais_grade(precos, parametros)
+    precos_atrasados = precos.sort_index().shift(atraso)
+    if pct_treino is not None:
+        precos_atrasados = precos_atrasados.iloc[int(len(precos_atrasados) * pct_treino):]
+    valores = precos_atrasados.to_numpy(dtype=float)
+
+    sinais = _alinhar_sinais(sinais, len(valores))
+    saldos, posicoes, invalidas = _simular_grade_long_only(valores, sinais, saldo_inicial)
+    if invalidas.any():
+        raise ValueError('Ordem de compra numa barra com preço nulo.')
+    pls = _lucro_acumulado_pct(saldos, posicoes, valores[:, None], saldo_inicial)
+
+    colunas = pd.MultiIndex.from_tuples(parametros, names=['janela_curta', 'janela_longa'])
+    retornos = pd.DataFrame(pls, index=precos_atrasados.index, columns=colunas)
+    return ResultadoGrade(parametros=list(parametros), retornos=retornos, posicoes=posicoes)
+
+
+def gerar_dobras(n_barras: int,
+                 janela_treino: int,
+                 janela_teste: int,
+                 passo: int | None = None,
+                 ancorado: bool = False) -> list[tuple[int, int, int]]:
+    """ Dobras (inicio_treino, inicio_teste, fim_teste) em posições de barra; o treino vai de inicio_treino até
+    inicio_teste e o teste até fim_teste (exclusivo). O passo padrão é o tamanho do teste. No modo ancorado o
+    treino sempre começa na primeira barra. """
+    passo = janela_teste if passo is None else passo
+    dobras = []
+    inicio = 0
+    while inicio + janela_treino + janela_teste <= n_barras:
+        inicio_teste = inicio + janela_treino
+        dobras.append((0 if ancorado else inicio, inicio_teste, inicio_teste + janela_teste))
+        inicio += passo
+    return dobras
+
+
+def _retorno_final_dobra(precos: np.ndarray, medias: np.ndarray, curtas: np.ndarray, longas: np.ndarray,
+                         inicio: int, fim: int, saldo_inicial: float) -> np.ndarray:
+    """ Retorno ao final do intervalo [inicio, fim) para cada combinação, começando zerado em `inicio`. Fica nulo
+    para as combinações que deram ordem de compra numa barra com preço nulo. """
+    # A barra i opera com o sinal do dia i - 1, como no WalkForward.
+    dias = np.maximum(np.arange(inicio, fim) - 1, 0)
+    sinais = np.nan_to_num(np.sign(medias[dias][:, curtas] - medias[dias][:, longas])).astype(np.int8)
+    saldos, posicoes, _ = _simular_grade_long_only(precos[inicio:fim], sinais, saldo_inicial)
+    return _lucro_acumulado_pct(saldos[-1], posicoes[-1], precos[fim - 1], saldo_inicial)
+
+
+def _avaliar_dobra(dados: np.ndarray, inicio_treino: int, inicio_teste: int, fim_teste: int,
+                   curtas: np.ndarray, longas: np.ndarray, saldo_inicial: float) -> tuple[int, float, float]:
+    """ Escolhe a melhor combinação no treino e mede o seu retorno no teste. `dados` tem os preços atrasados na
+    primeira coluna e as médias nas demais. Se nenhuma combinação tem retorno no treino (todos nulos), devolve
+    -1 e retornos nulos. """
+    precos, medias = dados[:, 0], dados[:, 1:]
+    retornos_treino = _retorno_final_dobra(precos, medias, curtas, longas, inicio_treino, inicio_teste,
+                                           saldo_inicial)
+    if np.isnan(retornos_treino).all():
+        return -1, np.nan, np.nan
+    melhor = int(np.nanargmax(retornos_treino))
+    retorno_teste = _retorno_final_dobra(precos, medias, curtas[[melhor]], longas[[melhor]], inicio_teste,
+                                         fim_teste, saldo_inicial)
+    return melhor, float(retornos_treino[melhor]), float(retorno_teste[0])
+
+
+def walk_forward_em_dobras(precos: pd.Series,
+                           parametros: list[tuple[int, int]],
+                           saldo_inicial: float,
+                           janela_treino: int,
+                           janela_teste: int,
+                           passo: int | None = None,
+                           ancorado: bool = False,
+                           atraso: int = 1,
+                           n_processos: int | None = 1) -> pd.DataFrame:
+    """ Walk-forward em várias dobras: em cada uma, escolhe a combinação do GoldenCrossLongOnly com maior
+    retorno no treino e a avalia no teste seguinte.
+
+    As médias são calculadas uma única vez sobre o histórico inteiro e fatiadas por dobra; as dobras rodam em
+    paralelo com `n_processos` diferente de 1. Retorna uma linha por dobra; dobras em que nenhuma combinação
+    tem retorno no treino ficam com janelas e retornos nulos. """
+    precos = precos.sort_index()
+    janelas = sorted({janela for combinacao in parametros for janela in combinacao})
+    posicao_janela = {janela: i for i, janela in enumerate(janelas)}
+    curtas = np.array([posicao_janela[curta] for curta, _ in parametros])
+    longas = np.array([posicao_janela[longa] for _, longa in parametros])
+
+    dados = np.column_stack([precos.shift(atraso).to_numpy(dtype=float), banco_media_exponencial(precos, janelas)])
+    dobras = gerar_dobras(len(precos), janela_treino, janela_teste, passo=passo, ancorado=ancorado)
+    avaliar = partial(_avaliar_dobra, curtas=curtas, longas=longas, saldo_inicial=saldo_inicial)
+    resultados = mapear(avaliar, dobras, dados, n_processos=n_processos)
+
+    datas = precos.index
+    linhas = []
+    for dobra, ((inicio_treino, inicio_teste, fim_teste), (melhor, retorno_treino, retorno_teste)) in \
+            enumerate(zip(dobras, resultados)):
+        janela_curta, janela_longa = parametros[melhor] if melhor >= 0 else (np.nan, np.nan)
+        linhas.append({'dobra': dobra,
+                       'inicio_treino': datas[inicio_treino],
+                       'inicio_teste': datas[inicio_teste],
+                       'fim_teste': datas[fim_teste - 1],
+                       'janela_curta': janela_curta,
+                       'janela_longa': janela_longa,
+                       'retorno_treino': retorno_treino,
+                       'retorno_teste': retorno_teste})
+    return pd.DataFrame(linhas).set_index('dobra')
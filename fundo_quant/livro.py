@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+import datetime
+import numpy as np
+import pandas as pd
+
+COMPRA = 1
+VENDA = -1
+
+_HORARIO_NULO = np.iinfo(np.int64).min
+
+
+def _horario_para_int64(horario: datetime.datetime | None) -> int:
+    if horario is None:
+        return _HORARIO_NULO
+    return pd.Timestamp(horario).value
+
+
+@dataclass(frozen=True)
+class ColunasOperacoes:
+    """ Operações em formato colunar: uma array por campo, todas do mesmo tamanho. """
+    lado: np.ndarray
+    preco: np.ndarray
+    quantidade: np.ndarray
+    horario: np.ndarray
+
+    def __len__(self):
+        return len(self.lado)
+
+    def filtrar(self, mascara: np.ndarray | slice) -> 'ColunasOperacoes':
+        return ColunasOperacoes(lado=self.lado[mascara],
+                                preco=self.preco[mascara],
+                                quantidade=self.quantidade[mascara],
+                                horario=self.horario[mascara])
+
+    @property
+    def valor_financeiro(self) -> np.ndarray:
+        return self.preco * self.quantidade
+
+
+class LivroDeOperacoes:
+    """ Registro compacto de operações em arrays NumPy que crescem por duplicação.
+
+    Cada operação ocupa 25 bytes (lado int8, preço e quantidade float64, horário int64 em nanossegundos),
+    contra algumas centenas de bytes de um objeto Compra/Venda. """
+
+    def __init__(self, capacidade_inicial: int = 1024):
+        self._tamanho = 0
+        self._lado = np.empty(capacidade_inicial, dtype=np.int8)
+        self._preco = np.empty(capacidade_inicial, dtype=np.float64)
+        self._quantidade = np.empty(capacidade_inicial, dtype=np.float64)
+        self._horario = np.empty(capacidade_inicial, dtype=np.int64)
+
+    def __len__(self):
+        return self._tamanho
+
+    def _crescer(self):
+        capacidade = max(2 * len(self._lado), 1)
+        for nome in ('_lado', '_preco', '_quantidade', '_horario'):
+            antiga = getattr(self, nome)
+            nova = np.empty(capacidade, dtype=antiga.dtype)
+            nova[:self._tamanho] = antiga[:self._tamanho]
+            setattr(self, nome, nova)
+
+    def adicionar(self, lado: int, preco: float, quantidade: int | float, horario: datetime.datetime | None):
+        if self._tamanho == len(self._lado):
+            self._crescer()
+        i = self._tamanho
+        self._lado[i] = lado
+        self._preco[i] = preco
+        self._quantidade[i] = quantidade
+        self._horario[i] = _horario_para_int64(horario)
+        self._tamanho += 1
+
+    def obter_operacoes(self) -> ColunasOperacoes:
+        """ Visões (sem cópia) das operações registradas, em ordem cronológica. """
+        n = self._tamanho
+        return ColunasOperacoes(lado=self._lado[:n],
+                                preco=self._preco[:n],
+                                quantidade=self._quantidade[:n],
+                                horario=self._horario[:n])
+
+    def obter_compras(self) -> ColunasOperacoes:
+        operacoes = self.obter_operacoes()
+        return operacoes.filtrar(operacoes.lado == COMPRA)
+
+    def obter_vendas(self) -> ColunasOperacoes:
+        operacoes = self.obter_operacoes()
+        return operacoes.filtrar(operacoes.lado == VENDA)
+
+    def obter_quantidade(self, lado: int) -> float:
+        operacoes = self.obter_operacoes()
+        return float(operacoes.quantidade[operacoes.lado == lado].sum())
+
+    def obter_operacoes_abertas(self) -> ColunasOperacoes:
+        """ Operações que compõem a posição atual, em ordem cronológica.
+
+        As saídas consomem as entradas mais antigas primeiro, logo a posição é formada pelas operações mais
+        recentes do seu lado; a mais antiga delas pode estar apenas parcialmente aberta. """
+        posicao = self.obter_quantidade(COMPRA) - self.obter_quantidade(VENDA)
+        if posicao == 0:
+            return self.obter_operacoes().filtrar(slice(0, 0))
+        operacoes = self.obter_compras() if posicao > 0 else self.obter_vendas()
+        acumulado = np.cumsum(operacoes.quantidade[::-1])
+        n_abertas = int(np.searchsorted(acumulado, abs(posicao))) + 1
+        abertas = operacoes.filtrar(slice(len(operacoes) - n_abertas, None))
+        quantidade = abertas.quantidade.copy()
+        quantidade[0] -= acumulado[n_abertas - 1] - abs(posicao)
+        return ColunasOperacoes(lado=abertas.lado, preco=abertas.preco,
+                                quantidade=quantidade, horario=abertas.horario)
+
+    def para_dataframe(self) -> pd.DataFrame:
+        """ DataFrame com as colunas do livro, sem copiar os dados sempre que o pandas permitir. """
+        operacoes = self.obter_operacoes()
+        horario = operacoes.horario.view('datetime64[ns]')
+        return pd.DataFrame({'Lado': operacoes.lado,
+                             'Preco': operacoes.preco,
+                             'Quantidade': operacoes.quantidade,
+                             'Horario': horario}, copy=False)
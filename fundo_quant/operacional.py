@@ -1,7 +1,10 @@
 from dataclasses import dataclass, field
+from collections import deque
 import datetime
 from typing import List
 from enum import Enum
+import pandas as pd
+from fundo_quant.livro import LivroDeOperacoes, COMPRA, VENDA
 
 
 class SaldoError(Exception):
@@ -43,11 +46,22 @@ class Venda:
 
 class Ativo:
 
-    def __init__(self, saldo_inicial):
-        self._operacoes: list[Compra | Venda] = []
+    def __init__(self, saldo_inicial, compacto: bool = False):
+        """ Com `compacto`, as operações são registradas num LivroDeOperacoes (arrays NumPy) em vez de uma
+        lista de objetos Compra/Venda, o que reduz a memória em históricos com milhões de operações. """
+        self._operacoes: list[Compra | Venda] | None = None if compacto else []
+        self.livro: LivroDeOperacoes | None = LivroDeOperacoes() if compacto else None
         self.saldo = saldo_inicial
         self.principal = saldo_inicial
 
+        # Totais acumulados, atualizados a cada operação para que as consultas sejam O(1).
+        self._quantidade_comprada = 0
+        self._quantidade_vendida = 0
+        # Lotes em aberto (preço, quantidade, horário), do mais antigo para o mais recente.
+        self._lotes_abertos: deque[list] = deque()
+        self._quantidade_aberta = 0
+        self._custo_aberto = 0
+
     def adicionar_capital(self, valor: float):
         self.saldo += valor
         self.principal += valor
@@ -58,25 +72,31 @@ class Ativo:
         self.saldo -= valor
         self.principal -= valor
 
+    def _obter_do_livro(self, tipo: type) -> List[Compra | Venda]:
+        operacoes = self.livro.obter_compras() if tipo is Compra else self.livro.obter_vendas()
+        horarios = [None if pd.isna(horario) else horario.to_pydatetime()
+                    for horario in pd.to_datetime(operacoes.horario)]
+        return [tipo(preco=preco, quantidade=quantidade, horario=horario)
+                for preco, quantidade, horario in zip(operacoes.preco.tolist(), operacoes.quantidade.tolist(),
+                                                      horarios)]
+
     def obter_compras(self) -> List[Compra] | None:
+        if self.livro is not None:
+            return self._obter_do_livro(Compra)
         if self._operacoes is not None:
             return [operacao for operacao in self._operacoes if isinstance(operacao, Compra)]
 
     def obter_vendas(self) -> List[Venda] | None:
+        if self.livro is not None:
+            return self._obter_do_livro(Venda)
         if self._operacoes is not None:
             return [operacao for operacao in self._operacoes if isinstance(operacao, Venda)]
 
     def obter_quantidade_comprada(self) -> int:
-        compras = self.obter_compras()
-        if compras is not None:
-            return sum([compra.quantidade for compra in compras])
-        return 0
+        return self._quantidade_comprada
 
     def obter_quantidade_vendida(self) -> int:
-        vendas = self.obter_vendas()
-        if vendas is not None:
-            return sum([venda.quantidade for venda in vendas])
-        return 0
+        return self._quantidade_vendida
 
     def _verificar_saldo_compra(self, preco: float, quantidade: int):
         valor_financeiro = preco * quantidade
@@ -84,14 +104,49 @@ class Ativo:
             raise SaldoError(f"Saldo de {round(self.saldo ,2)}"
                              f" insuficiente para compra no valor de {round(valor_financeiro,2)}")
 
+    def _atualizar_lotes(self, preco: float, quantidade: int, horario: datetime, sinal: int):
+        """ Atualiza os lotes em aberto com uma operação de sinal +1 (compra) ou -1 (venda).
+
+        Operações no sentido oposto ao da posição consomem os lotes mais antigos primeiro, de modo que
+        os lotes restantes são sempre as operações mais recentes do lado da posição. """
+        posicao = self._quantidade_comprada - self._quantidade_vendida
+        restante = quantidade
+        if posicao * sinal < 0:
+            while restante > 0 and self._lotes_abertos:
+                lote = self._lotes_abertos[0]
+                consumido = min(lote[1], restante)
+                lote[1] -= consumido
+                restante -= consumido
+                self._quantidade_aberta -= consumido
+                self._custo_aberto -= lote[0] * consumido
+                if lote[1] == 0:
+                    self._lotes_abertos.popleft()
+            if not self._lotes_abertos:
+                self._quantidade_aberta = 0
+                self._custo_aberto = 0
+        if restante > 0:
+            self._lotes_abertos.append([preco, restante, horario])
+            self._quantidade_aberta += restante
+            self._custo_aberto += preco * restante
+
     def _adicionar_compra(self, preco: float, quantidade: int, horario: datetime):
         self._verificar_saldo_compra(preco=preco, quantidade=quantidade)
         self.saldo -= preco * quantidade
-        self._operacoes.append(Compra(preco=preco, quantidade=quantidade, horario=horario))
+        if self.livro is not None:
+            self.livro.adicionar(lado=COMPRA, preco=preco, quantidade=quantidade, horario=horario)
+        else:
+            self._operacoes.append(Compra(preco=preco, quantidade=quantidade, horario=horario))
+        self._atualizar_lotes(preco=preco, quantidade=quantidade, horario=horario, sinal=1)
+        self._quantidade_comprada += quantidade
 
     def _adicionar_venda(self, preco: float, quantidade: int, horario: datetime):
-        self._operacoes.append(Venda(preco=preco, quantidade=quantidade, horario=horario))
+        if self.livro is not None:
+            self.livro.adicionar(lado=VENDA, preco=preco, quantidade=quantidade, horario=horario)
+        else:
+            self._operacoes.append(Venda(preco=preco, quantidade=quantidade, horario=horario))
         self.saldo += preco * quantidade
+        self._atualizar_lotes(preco=preco, quantidade=quantidade, horario=horario, sinal=-1)
+        self._quantidade_vendida += quantidade
 
     def comprar(self, preco: float, quantidade: int, horario: datetime):
         posicao = self.obter_posicao()
@@ -110,7 +165,7 @@ class Ativo:
             self._adicionar_venda(preco=preco, quantidade=quantidade, horario=horario)
 
     def obter_posicao(self) -> int:
-        return self.obter_quantidade_comprada() - self.obter_quantidade_vendida()
+        return self._quantidade_comprada - self._quantidade_vendida
 
     def fechar_posicao(self, preco: float, horario: datetime):
         posicao = self.obter_posicao()
@@ -127,29 +182,18 @@ class Ativo:
             self.comprar(preco=preco, quantidade=-2 * posicao, horario=horario)
 
     def obter_operacoes_abertas(self) -> List[Compra | Venda] | None:
+        """ Operações que compõem a posição atual, da mais recente para a mais antiga. """
         posicao = self.obter_posicao()
         if posicao == 0:
             return
-        if posicao > 0:
-            operacoes = self.obter_compras()
-        else:
-            operacoes = self.obter_vendas()
-        operacoes.reverse()
-        soma = 0
-        operacoes_abertas = []
-        for operacao in operacoes:
-            soma = soma + operacao.quantidade
-            operacoes_abertas.append(operacao)
-            if soma == abs(posicao):
-                return operacoes_abertas
+        tipo = Compra if posicao > 0 else Venda
+        return [tipo(preco=preco, quantidade=quantidade, horario=horario)
+                for preco, quantidade, horario in reversed(self._lotes_abertos)]
 
     def preco_medio(self):
-        operacoes = self.obter_operacoes_abertas()
-        if operacoes is None:
+        if self.obter_posicao() == 0 or self._quantidade_aberta == 0:
             return 0
-        quantidade = sum([operacao.quantidade for operacao in operacoes])
-        valor_financeiro = sum([operacao.valor_financeiro for operacao in operacoes])
-        return round(abs(valor_financeiro / quantidade), 10)
+        return round(abs(self._custo_aberto / self._quantidade_aberta), 10)
 
     def obter_resultado_por_unidade_em_aberto(self, preco_atual: float):
         posicao = self.obter_posicao()
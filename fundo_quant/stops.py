@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def _barras_das_operacoes(entradas: np.ndarray, saidas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ Posições das barras estritamente entre cada entrada e a sua saída, concatenadas, e a operação a que
+    cada barra pertence. """
+    tamanhos = np.maximum(saidas - entradas - 1, 0)
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    operacao = np.repeat(np.arange(len(entradas)), tamanhos)
+    barras = entradas[operacao] + 1 + np.arange(tamanhos.sum()) - inicios[operacao]
+    return barras, operacao
+
+
+def _primeira_por_operacao(acionado: np.ndarray, barras: np.ndarray, operacao: np.ndarray,
+                           saidas: np.ndarray) -> np.ndarray:
+    """ Primeira barra acionada de cada operação, ou a saída original se nenhuma for. """
+    primeira = saidas.copy()
+    np.minimum.at(primeira, operacao[acionado], barras[acionado])
+    return primeira
+
+
+def _limites(retornos: np.ndarray, stop_loss: float | None, stop_gain: float | None) -> np.ndarray:
+    acionado = np.zeros(len(retornos), dtype=bool)
+    if stop_gain is not None:
+        acionado |= retornos > abs(stop_gain)
+    if stop_loss is not None:
+        acionado |= retornos < -abs(stop_loss)
+    return acionado
+
+
+def primeira_passagem(precos: np.ndarray,
+                      entradas: np.ndarray,
+                      saidas: np.ndarray,
+                      stop_loss: float | None = None,
+                      stop_gain: float | None = None) -> np.ndarray:
+    """ Para cada operação comprada aberta na barra `entradas[k]` e encerrada em `saidas[k]`, a primeira barra
+    entre as duas em que o resultado em aberto fica abaixo de -|stop_loss| ou acima de |stop_gain|, como no
+    ExecutorLongOnly. Se nenhum limite for cruzado, devolve a própria saída.
+
+    Todas as operações são avaliadas de uma vez, sobre o vetor concatenado das suas barras. """
+    precos = np.asarray(precos, dtype=float)
+    entradas = np.asarray(entradas, dtype=np.int64)
+    saidas = np.asarray(saidas, dtype=np.int64)
+    barras, operacao = _barras_das_operacoes(entradas, saidas)
+    retornos = precos[barras] / precos[entradas[operacao]] - 1
+    return _primeira_por_operacao(_limites(retornos, stop_loss, stop_gain), barras, operacao, saidas)
+
+
+def varrer_stops(precos: np.ndarray,
+                 entradas: np.ndarray,
+                 saidas: np.ndarray,
+                 stops_loss: list[float | None],
+                 stops_gain: list[float | None]) -> np.ndarray:
+    """ `primeira_passagem` para cada par (stops_loss[i], stops_gain[i]), com as mesmas entradas e saídas.
+
+    Os retornos em aberto são calculados uma única vez; cada nível custa uma comparação sobre o vetor. Não
+    considera reentradas depois de um stop. Retorna uma matriz níveis x operações. """
+    precos = np.asarray(precos, dtype=float)
+    entradas = np.asarray(entradas, dtype=np.int64)
+    saidas = np.asarray(saidas, dtype=np.int64)
+    barras, operacao = _barras_das_operacoes(entradas, saidas)
+    retornos = precos[barras] / precos[entradas[operacao]] - 1
+    return np.array([_primeira_por_operacao(_limites(retornos, stop_loss, stop_gain), barras, operacao, saidas)
+                     for stop_loss, stop_gain in zip(stops_loss, stops_gain)]).reshape(len(stops_loss), len(entradas))
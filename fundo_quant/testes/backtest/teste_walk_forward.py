@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.backtest import WalkForward, WalkForwardVetorizado
+from fundo_quant.estrategia import GoldenCrossLongOnly
+from fundo_quant.executores import ExecutorLongOnly
+from fundo_quant.operacional import Ativo
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(300, semente=13)
+
+
+class GoldenCrossDiaADia(GoldenCrossLongOnly):
+    """ Só oferece o protocolo dia a dia. """
+
+    def obter_sinais(self):
+        return None
+
+
+def _rodar(precos: pd.Series, classe: type, stop_loss: float | None = None, teste: bool = False) -> pd.Series:
+    ativo = Ativo(saldo_inicial=1_000)
+    estrategia = classe(ativo, media_curta=MediaMovel.exponencial(precos, window=5),
+                        media_longa=MediaMovel.exponencial(precos, window=20))
+    backtest = WalkForward(estrategia=estrategia, ex=ExecutorLongOnly(ativo, stop_loss=stop_loss), precos=precos)
+    return backtest.obter_serie_retorno_teste() if teste else backtest.obter_serie()
+
+
+def teste_sinais_de_uma_vez_igual_dia_a_dia(precos):
+    pd.testing.assert_series_equal(_rodar(precos, GoldenCrossLongOnly), _rodar(precos, GoldenCrossDiaADia))
+
+
+def teste_sinais_de_uma_vez_igual_dia_a_dia_com_stop(precos):
+    pd.testing.assert_series_equal(_rodar(precos, GoldenCrossLongOnly, stop_loss=0.02),
+                                   _rodar(precos, GoldenCrossDiaADia, stop_loss=0.02))
+
+
+def teste_sinais_de_uma_vez_igual_dia_a_dia_periodo_de_teste(precos):
+    pd.testing.assert_series_equal(_rodar(precos, GoldenCrossLongOnly, teste=True),
+                                   _rodar(precos, GoldenCrossDiaADia, teste=True))
+
+
+def teste_vetorizado_exige_sinais(precos):
+    estrategia = GoldenCrossDiaADia(Ativo(1_000), media_curta=precos, media_longa=precos)
+    with pytest.raises(ValueError):
+        WalkForwardVetorizado.de_estrategia(estrategia, precos=precos, saldo_inicial=1_000)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.backtest import WalkForwardCarteira, WalkForwardVetorizado
+from fundo_quant.estrategia import sinais_cruzamento
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(300, semente=5, colunas=['A', 'B', 'C'])
+
+
+def _sinais(df: pd.DataFrame) -> np.ndarray:
+    return sinais_cruzamento(MediaMovel.exponencial(df, window=5), MediaMovel.exponencial(df, window=20))
+
+
+def teste_carteira_um_ativo_igual_backtest_individual(precos):
+    serie = WalkForwardCarteira(sinais=_sinais(precos[['A']]), precos=precos[['A']], saldo_inicial=1_000).obter_serie()
+    esperado = WalkForwardVetorizado(sinais=_sinais(precos[['A']])[:, 0], precos=precos['A'],
+                                     saldo_inicial=1_000).obter_serie()
+    np.testing.assert_allclose(serie.values, esperado.values, atol=1e-12)
+
+
+def teste_carteira_divide_saldo_entre_compras_simultaneas(precos):
+    sinais = np.zeros((3, 2))
+    sinais[0] = 1
+    df = pd.DataFrame({'A': [10.0, 10.0, 10.0], 'B': [20.0, 20.0, 20.0]}, index=precos.index[:3])
+    backtest = WalkForwardCarteira(sinais=sinais, precos=df, saldo_inicial=100, atraso=0)
+    backtest.obter_serie()
+    assert backtest.posicoes.iloc[-1].tolist() == [5, 2]
+
+
+def teste_carteira_saldo_nunca_negativo(precos):
+    backtest = WalkForwardCarteira(sinais=_sinais(precos), precos=precos, saldo_inicial=1_000)
+    serie = backtest.obter_serie()
+    investido = (backtest.posicoes * precos.shift(1)).sum(axis=1)
+    assert ((serie + 1) * 1_000 - investido >= -1e-9).all()
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.backtest import WalkForward, WalkForwardEmFluxo
+from fundo_quant.estrategia import GoldenCrossLongOnly, GoldenCrossLongOnlyIncremental
+from fundo_quant.executores import ExecutorLongOnly
+from fundo_quant.operacional import Ativo
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(300, semente=11)
+
+
+def _rodar_loop(precos: pd.Series, atraso: int) -> pd.Series:
+    ativo = Ativo(saldo_inicial=1_000)
+    estrategia = GoldenCrossLongOnly(ativo, media_curta=MediaMovel.exponencial(precos, window=5),
+                                     media_longa=MediaMovel.exponencial(precos, window=15))
+    return WalkForward(estrategia=estrategia, ex=ExecutorLongOnly(ativo), precos=precos, atraso=atraso).obter_serie()
+
+
+def _backtest_em_fluxo(atraso: int) -> WalkForwardEmFluxo:
+    ativo = Ativo(saldo_inicial=1_000)
+    estrategia = GoldenCrossLongOnlyIncremental(ativo, janela_curta=5, janela_longa=15)
+    return WalkForwardEmFluxo(estrategia=estrategia, ex=ExecutorLongOnly(ativo), atraso=atraso)
+
+
+def teste_em_fluxo_igual_walk_forward(precos):
+    barras = ((horario, preco) for horario, preco in precos.items())
+    horarios, pls = zip(*_backtest_em_fluxo(atraso=1).iterar(barras))
+    pd.testing.assert_series_equal(pd.Series(pls, index=list(horarios)), _rodar_loop(precos, atraso=1))
+
+
+def teste_em_fluxo_barras_ohlcv(precos):
+    barras = ((horario, preco, preco, preco, preco, 0) for horario, preco in precos.items())
+    resultado = _backtest_em_fluxo(atraso=2).obter_resultado(barras)
+    assert resultado == _rodar_loop(precos, atraso=2).iloc[-1]
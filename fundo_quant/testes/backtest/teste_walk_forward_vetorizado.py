@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.backtest import WalkForward, WalkForwardVetorizado
+from fundo_quant.estrategia import GoldenCrossLongOnly, sinais_cruzamento
+from fundo_quant.executores import ExecutorLongOnly
+from fundo_quant.operacional import Ativo
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    precos = gerar_precos(400, semente=7)
+    # Preços constantes no início: nenhum dos dois aceita ordens de compra enquanto o preço atrasado é nulo (ver
+    # teste_compra_com_preco_nulo_falha_nos_dois).
+    precos.iloc[:5] = precos.iloc[0]
+    return precos
+
+
+def _rodar_loop(precos: pd.Series, saldo_inicial: float, atraso: int, teste: bool,
+                stop_loss: float | None = None, stop_gain: float | None = None) -> pd.Series:
+    ativo = Ativo(saldo_inicial=saldo_inicial)
+    media_curta = MediaMovel.exponencial(precos, window=5)
+    media_longa = MediaMovel.exponencial(precos, window=20)
+    estrategia = GoldenCrossLongOnly(ativo, media_curta=media_curta, media_longa=media_longa)
+    backtest = WalkForward(estrategia=estrategia, ex=ExecutorLongOnly(ativo, stop_loss=stop_loss, stop_gain=stop_gain),
+                           precos=precos, atraso=atraso)
+    return backtest.obter_serie_retorno_teste() if teste else backtest.obter_serie()
+
+
+def _rodar_vetorizado(precos: pd.Series, saldo_inicial: float, atraso: int, teste: bool,
+                      stop_loss: float | None = None, stop_gain: float | None = None) -> pd.Series:
+    sinais = sinais_cruzamento(MediaMovel.exponencial(precos, window=5), MediaMovel.exponencial(precos, window=20))
+    backtest = WalkForwardVetorizado(sinais=sinais, precos=precos, saldo_inicial=saldo_inicial, atraso=atraso,
+                                     stop_loss=stop_loss, stop_gain=stop_gain)
+    return backtest.obter_serie_retorno_teste() if teste else backtest.obter_serie()
+
+
+def teste_paridade_serie_completa(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 10_000, 1, False), _rodar_loop(precos, 10_000, 1, False),
+                                   atol=1e-9)
+
+
+def teste_paridade_atraso_maior(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 10_000, 3, False), _rodar_loop(precos, 10_000, 3, False),
+                                   atol=1e-9)
+
+
+def teste_paridade_saldo_menor_que_preco(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 110, 1, False), _rodar_loop(precos, 110, 1, False),
+                                   atol=1e-9)
+
+
+def teste_paridade_periodo_de_teste(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 10_000, 1, True), _rodar_loop(precos, 10_000, 1, True),
+                                   atol=1e-9)
+
+
+def teste_paridade_stop_loss(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 10_000, 1, False, stop_loss=0.02),
+                                   _rodar_loop(precos, 10_000, 1, False, stop_loss=0.02), atol=1e-9)
+
+
+def teste_paridade_stop_loss_e_gain(precos):
+    pd.testing.assert_series_equal(_rodar_vetorizado(precos, 10_000, 1, False, stop_loss=0.03, stop_gain=0.04),
+                                   _rodar_loop(precos, 10_000, 1, False, stop_loss=0.03, stop_gain=0.04), atol=1e-9)
+
+
+def teste_compra_com_preco_nulo_falha_nos_dois(precos):
+    # Alta desde o primeiro dia: o sinal de compra chega quando o preço atrasado ainda é nulo.
+    subindo = pd.Series(100 * np.exp(np.cumsum(np.full(len(precos), 0.01))), index=precos.index)
+    ativo = Ativo(saldo_inicial=10_000)
+    estrategia = GoldenCrossLongOnly(ativo, media_curta=MediaMovel.exponencial(subindo, window=5),
+                                     media_longa=MediaMovel.exponencial(subindo, window=20))
+    with pytest.raises(ValueError):
+        WalkForward(estrategia=estrategia, ex=ExecutorLongOnly(ativo), precos=subindo, atraso=3).obter_serie()
+    sinais = sinais_cruzamento(MediaMovel.exponencial(subindo, window=5), MediaMovel.exponencial(subindo, window=20))
+    with pytest.raises(ValueError):
+        WalkForwardVetorizado(sinais=sinais, precos=subindo, saldo_inicial=10_000, atraso=3).obter_serie()
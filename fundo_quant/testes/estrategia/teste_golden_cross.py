@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
-from fundo_quant.estrategia import GoldenCrossLongOnly
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.estrategia import GoldenCrossLongOnly, GoldenCrossLongOnlyIncremental
 from fundo_quant.operacional import Ativo, Ordem
 from datetime import datetime
 
@@ -29,3 +31,23 @@ def teste_sinal_depois_de_uma_compra():
     ativo.comprar(preco=10, quantidade=10, horario=dias[0])
     es.setar_dia(1)
     assert es.obter_ordem() == Ordem.VENDER
+
+
+def teste_sinais_de_uma_vez():
+    ativo = Ativo(100)
+    es = GoldenCrossLongOnly(ativo=ativo, media_curta=media_curta, media_longa=media_longa)
+    assert es.obter_sinais().tolist() == [1, -1, -1]
+
+
+def teste_incremental_igual_ao_lote_com_nulos(gerar_precos):
+    precos = gerar_precos(200, semente=5)
+    precos.iloc[[0, 1, 40, 41, 42, 120]] = np.nan
+    curta, longa = MediaMovel.exponencial(precos, window=5), MediaMovel.exponencial(precos, window=20)
+    lote = GoldenCrossLongOnly(ativo=Ativo(100), media_curta=curta, media_longa=longa)
+    incremental = GoldenCrossLongOnlyIncremental(ativo=Ativo(100), janela_curta=5, janela_longa=20)
+    for dia, preco in enumerate(precos):
+        incremental.atualizar(preco)
+        lote.setar_dia(dia)
+        assert incremental.obter_ordem() == lote.obter_ordem()
+        np.testing.assert_array_equal([incremental.media_curta, incremental.media_longa],
+                                      [curta.iloc[dia], longa.iloc[dia]])
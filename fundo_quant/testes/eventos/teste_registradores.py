@@ -0,0 +1,30 @@
+from fundo_quant.eventos import RegistradorArquivo, RegistradorMemoria, RegistradorTela, TipoEvento
+from datetime import datetime
+
+
+def teste_registrador_arquivo_grava_em_lotes(tmp_path):
+    caminho = tmp_path / 'eventos.csv'
+    registrador = RegistradorArquivo(str(caminho), tamanho_lote=2)
+    registrador.registrar(TipoEvento.COMPRA, 10, 5, datetime(2022, 1, 1))
+    assert caminho.read_text().count('\n') == 1
+    registrador.registrar(TipoEvento.VENDA, 12, 5, datetime(2022, 1, 2))
+    assert caminho.read_text().count('\n') == 3
+
+
+def teste_registrador_arquivo_fechar_grava_restante(tmp_path):
+    caminho = tmp_path / 'eventos.csv'
+    with RegistradorArquivo(str(caminho)) as registrador:
+        registrador.registrar(TipoEvento.STOP_GAIN, 12, 5, datetime(2022, 1, 2))
+    assert caminho.read_text().splitlines()[-1] == 'stop_gain,12,5,2022-01-02 00:00:00'
+
+
+def teste_registrador_memoria_dataframe():
+    registrador = RegistradorMemoria()
+    registrador.registrar(TipoEvento.COMPRA, 10, 5, datetime(2022, 1, 1))
+    df = registrador.para_dataframe()
+    assert df['Tipo'].tolist() == ['compra'] and df['Quantidade'].tolist() == [5]
+
+
+def teste_registrador_tela(capsys):
+    RegistradorTela().registrar(TipoEvento.COMPRA, 10, 5, datetime(2022, 1, 1))
+    assert capsys.readouterr().out == 'Comprando 5 ao preco R$10.\n'
@@ -1,5 +1,6 @@
 from fundo_quant.executores import ExecutorLongOnly
 from fundo_quant.operacional import Ativo, Ordem
+from fundo_quant.eventos import RegistradorMemoria, TipoEvento
 from datetime import datetime
 
 
@@ -71,3 +72,28 @@ def teste_stop_gain_valor_negativo():
     ex.executar_ordem(ordem=Ordem.COMPRAR, preco=10, horario=datetime(2022, 1, 1))
     ex.executar_ordem(ordem=None, preco=12, horario=datetime(2022, 1, 1))
     assert ativo.obter_posicao() == 0
+
+
+def teste_registrar_compra_e_venda():
+    ativo = Ativo(100)
+    registrador = RegistradorMemoria()
+    ex = ExecutorLongOnly(ativo, registrador=registrador)
+    ex.executar_ordem(ordem=Ordem.COMPRAR, preco=10, horario=datetime(2022, 1, 1))
+    ex.executar_ordem(ordem=Ordem.VENDER, preco=8, horario=datetime(2022, 1, 2))
+    assert registrador.eventos == [(TipoEvento.COMPRA, 10, 10, datetime(2022, 1, 1)),
+                                   (TipoEvento.VENDA, 8, 10, datetime(2022, 1, 2))]
+
+
+def teste_registrar_stop_loss():
+    ativo = Ativo(100)
+    registrador = RegistradorMemoria()
+    ex = ExecutorLongOnly(ativo, stop_loss=0.03, registrador=registrador)
+    ex.executar_ordem(ordem=Ordem.COMPRAR, preco=10, horario=datetime(2022, 1, 1))
+    ex.executar_ordem(ordem=None, preco=8, horario=datetime(2022, 1, 2))
+    assert registrador.eventos[-1] == (TipoEvento.STOP_LOSS, 8, 10, datetime(2022, 1, 2))
+
+
+def teste_sem_registrador_nao_imprime(capsys):
+    ex = ExecutorLongOnly(Ativo(100))
+    ex.executar_ordem(ordem=Ordem.COMPRAR, preco=10, horario=datetime(2022, 1, 1))
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculadora.indicadores.tendencia import MediaMovel
+from fundo_quant.backtest import WalkForwardVetorizado
+from fundo_quant.estrategia import sinais_cruzamento
+from fundo_quant.grade import avaliar_grade_golden_cross
+
+parametros = [(5, 20), (5, 30), (10, 30), (12, 40)]
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(500, semente=3)
+
+
+def _retorno_individual(precos: pd.Series, janela_curta: int, janela_longa: int, saldo_inicial: float,
+                        teste: bool) -> pd.Series:
+    sinais = sinais_cruzamento(MediaMovel.exponencial(precos, window=janela_curta),
+                               MediaMovel.exponencial(precos, window=janela_longa))
+    backtest = WalkForwardVetorizado(sinais=sinais, precos=precos, saldo_inicial=saldo_inicial)
+    return backtest.obter_serie_retorno_teste() if teste else backtest.obter_serie()
+
+
+def teste_grade_igual_backtest_individual(precos):
+    resultado = avaliar_grade_golden_cross(precos, parametros, saldo_inicial=130)
+    for curta, longa in parametros:
+        esperado = _retorno_individual(precos, curta, longa, 130, False)
+        np.testing.assert_allclose(resultado.obter_retorno(curta, longa).values, esperado.values, atol=1e-12)
+
+
+def teste_grade_periodo_de_teste(precos):
+    resultado = avaliar_grade_golden_cross(precos, parametros, saldo_inicial=10_000, pct_treino=0.8)
+    assert len(resultado.retornos) == 100
+    for curta, longa in parametros:
+        esperado = _retorno_individual(precos, curta, longa, 10_000, True)
+        np.testing.assert_allclose(resultado.obter_retorno(curta, longa).values, esperado.values, atol=1e-12)
+
+
+def teste_grade_tabela_de_desempenho(precos):
+    resultado = avaliar_grade_golden_cross(precos, parametros, saldo_inicial=10_000)
+    tabela = resultado.obter_desempenho()
+    assert sorted(tabela.index) == sorted(parametros)
+    assert tabela['sharpe'].is_monotonic_decreasing
+    curva = 1 + resultado.obter_retorno(5, 20).dropna()
+    np.testing.assert_allclose(tabela.loc[(5, 20), 'max_drawdown'], (curva / curva.cummax() - 1).min())
+
+
+def teste_grade_compra_com_preco_nulo_falha(precos):
+    subindo = pd.Series(np.linspace(100, 200, len(precos)), index=precos.index)
+    with pytest.raises(ValueError):
+        avaliar_grade_golden_cross(subindo, parametros, saldo_inicial=10_000, atraso=3)
+    sinais = sinais_cruzamento(MediaMovel.exponencial(subindo, window=5), MediaMovel.exponencial(subindo, window=20))
+    with pytest.raises(ValueError):
+        WalkForwardVetorizado(sinais=sinais, precos=subindo, saldo_inicial=10_000, atraso=3).obter_serie()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fundo_quant.grade import avaliar_grade_golden_cross, gerar_dobras, walk_forward_em_dobras
+
+parametros = [(5, 20), (5, 30), (10, 30), (12, 40)]
+
+
+@pytest.fixture(scope='module')
+def precos(gerar_precos):
+    return gerar_precos(600, semente=9)
+
+
+def teste_gerar_dobras_rolantes():
+    assert gerar_dobras(10, janela_treino=4, janela_teste=2) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+
+
+def teste_gerar_dobras_ancoradas():
+    assert gerar_dobras(10, janela_treino=4, janela_teste=3, passo=3, ancorado=True) == [(0, 4, 7), (0, 7, 10)]
+
+
+def teste_primeira_dobra_igual_grade(precos):
+    tabela = walk_forward_em_dobras(precos, parametros, saldo_inicial=1_000, janela_treino=200, janela_teste=100)
+    grade = avaliar_grade_golden_cross(precos.iloc[:200], parametros, saldo_inicial=1_000)
+    finais = grade.retornos.iloc[-1]
+    assert (tabela.loc[0, 'janela_curta'], tabela.loc[0, 'janela_longa']) == finais.idxmax()
+    assert tabela.loc[0, 'retorno_treino'] == finais.max()
+
+
+def teste_dobras_em_paralelo_iguais_serial(precos):
+    serial = walk_forward_em_dobras(precos, parametros, saldo_inicial=1_000, janela_treino=200, janela_teste=100)
+    paralelo = walk_forward_em_dobras(precos, parametros, saldo_inicial=1_000, janela_treino=200, janela_teste=100,
+                                      n_processos=2)
+    assert len(serial) == 4
+    pd.testing.assert_frame_equal(serial, paralelo)
+
+
+def teste_dobra_sem_retorno_no_treino(precos):
+    com_nulos = precos.copy()
+    com_nulos.iloc[150:210] = np.nan
+    tabela = walk_forward_em_dobras(com_nulos, parametros, saldo_inicial=1_000, janela_treino=200, janela_teste=100)
+    assert tabela.loc[0, ['janela_curta', 'janela_longa', 'retorno_treino', 'retorno_teste']].isna().all()
+    # A dobra cujo treino começa depois da lacuna segue normalmente.
+    assert len(tabela) == 4 and tabela.iloc[3:].notna().all().all()
@@ -72,6 +72,14 @@ def testar_operacoes_abertas_v_3():
     assert ativo.obter_operacoes_abertas() == [Compra(preco=10, quantidade=1, horario=datetime(2022, 1, 1))]
 
 
+def testar_operacoes_abertas_venda_parcial():
+    ativo = Ativo(saldo_inicial=100)
+    ativo.comprar(preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    ativo.comprar(preco=20, quantidade=3, horario=datetime(2022, 1, 2))
+    ativo.vender(preco=15, quantidade=3, horario=datetime(2022, 1, 3))
+    assert ativo.obter_operacoes_abertas() == [Compra(preco=20, quantidade=2, horario=datetime(2022, 1, 2))]
+
+
 def testar_preco_medio_comprado():
     ativo = Ativo(saldo_inicial=100)
     ativo.comprar(preco=10, quantidade=2, horario=datetime(2022, 1, 1))
@@ -100,6 +108,14 @@ def testar_preco_medio_vendido():
     assert ativo.preco_medio() == 15
 
 
+def testar_preco_medio_venda_parcial():
+    ativo = Ativo(saldo_inicial=100)
+    ativo.comprar(preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    ativo.comprar(preco=20, quantidade=2, horario=datetime(2022, 1, 1))
+    ativo.vender(preco=20, quantidade=3, horario=datetime(2022, 1, 1))
+    assert ativo.preco_medio() == 20
+
+
 def testar_saldo_compra():
     ativo = Ativo(saldo_inicial=100)
     ativo.comprar(preco=10, quantidade=2, horario=datetime(2022, 1, 1))
@@ -0,0 +1,55 @@
+from fundo_quant.operacional import Ativo, Compra, Venda
+from fundo_quant.livro import LivroDeOperacoes, COMPRA, VENDA
+from datetime import datetime
+import numpy as np
+
+
+def testar_livro_crescer_capacidade():
+    livro = LivroDeOperacoes(capacidade_inicial=2)
+    for i in range(5):
+        livro.adicionar(lado=COMPRA, preco=10 + i, quantidade=1, horario=datetime(2022, 1, 1 + i))
+    assert len(livro) == 5 and livro.obter_operacoes().preco.tolist() == [10, 11, 12, 13, 14]
+
+
+def testar_livro_compras_e_vendas():
+    livro = LivroDeOperacoes()
+    livro.adicionar(lado=COMPRA, preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    livro.adicionar(lado=VENDA, preco=12, quantidade=1, horario=datetime(2022, 1, 2))
+    livro.adicionar(lado=COMPRA, preco=11, quantidade=3, horario=datetime(2022, 1, 3))
+    assert livro.obter_compras().quantidade.tolist() == [2, 3]
+    assert livro.obter_vendas().preco.tolist() == [12]
+
+
+def testar_livro_operacoes_abertas_parcial():
+    livro = LivroDeOperacoes()
+    livro.adicionar(lado=COMPRA, preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    livro.adicionar(lado=COMPRA, preco=20, quantidade=3, horario=datetime(2022, 1, 2))
+    livro.adicionar(lado=VENDA, preco=15, quantidade=3, horario=datetime(2022, 1, 3))
+    abertas = livro.obter_operacoes_abertas()
+    assert abertas.preco.tolist() == [20] and abertas.quantidade.tolist() == [2]
+
+
+def testar_livro_sem_operacoes_abertas():
+    livro = LivroDeOperacoes()
+    livro.adicionar(lado=COMPRA, preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    livro.adicionar(lado=VENDA, preco=15, quantidade=2, horario=datetime(2022, 1, 3))
+    assert len(livro.obter_operacoes_abertas()) == 0
+
+
+def testar_livro_para_dataframe_sem_copia():
+    livro = LivroDeOperacoes()
+    livro.adicionar(lado=COMPRA, preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    df = livro.para_dataframe()
+    assert df['Horario'].iloc[0] == datetime(2022, 1, 1)
+    assert np.shares_memory(df['Preco'].values, livro.obter_operacoes().preco)
+
+
+def testar_ativo_compacto_mesmo_resultado():
+    ativo = Ativo(saldo_inicial=100, compacto=True)
+    ativo.comprar(preco=10, quantidade=2, horario=datetime(2022, 1, 1))
+    ativo.inverter_posicao(preco=10, horario=datetime(2022, 1, 2))
+    ativo.comprar(preco=10, quantidade=3, horario=datetime(2022, 1, 3))
+    assert ativo.obter_operacoes_abertas() == [Compra(preco=10, quantidade=1, horario=datetime(2022, 1, 3))]
+    assert ativo.obter_vendas() == [Venda(preco=10, quantidade=2, horario=datetime(2022, 1, 2)),
+                                    Venda(preco=10, quantidade=2, horario=datetime(2022, 1, 2))]
+    assert ativo.obter_posicao() == 1 and ativo.saldo == 90
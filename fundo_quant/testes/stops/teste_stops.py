@@ -0,0 +1,25 @@
+import numpy as np
+from fundo_quant.stops import primeira_passagem, varrer_stops
+
+precos = np.array([10, 10.5, 9.6, 11, 12, 10, 9, 10.4, 10])
+
+
+def teste_primeira_passagem_stop_loss():
+    assert primeira_passagem(precos, [0], [8], stop_loss=0.03).tolist() == [2]
+
+
+def teste_primeira_passagem_stop_gain():
+    assert primeira_passagem(precos, [0], [8], stop_gain=0.15).tolist() == [4]
+
+
+def teste_primeira_passagem_sem_acionar_devolve_saida():
+    assert primeira_passagem(precos, [0, 5], [2, 8], stop_loss=0.2, stop_gain=0.2).tolist() == [2, 8]
+
+
+def teste_primeira_passagem_varias_operacoes():
+    assert primeira_passagem(precos, [0, 4, 6], [4, 6, 8], stop_loss=0.06, stop_gain=0.06).tolist() == [3, 5, 7]
+
+
+def teste_varrer_stops():
+    saidas = varrer_stops(precos, [0], [8], stops_loss=[0.03, 0.05, None], stops_gain=[None, None, 0.15])
+    assert saidas.tolist() == [[2], [6], [4]]